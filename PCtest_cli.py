@@ -9,11 +9,12 @@
 import sys
 import os
 import argparse
+import multiprocessing
 import json
 import time
 
 # 导入性能测试核心模块
-from PCtest_core import PerformanceBenchmark
+from PCtest_core import PerformanceBenchmark, EXTENDED_TESTS
 
 # 导入多语言支持模块
 import language as lang
@@ -29,6 +30,11 @@ def parse_args():
     parser.add_argument("--disk", action="store_true", help=lang.get('cli_disk_help'))
     parser.add_argument("--gpu", action="store_true", help=lang.get('cli_gpu_help'))
     parser.add_argument("--all", action="store_true", help=lang.get('cli_all_help'))
+    parser.add_argument("--extended", nargs="+", choices=sorted(EXTENDED_TESTS), default=[],
+                        metavar="TEST", help=lang.get('cli_extended_help'))
+    parser.add_argument("--disk-target", nargs="+", metavar="PATH", help=lang.get('cli_disk_target_help'))
+    parser.add_argument("--allow-non-disk", action="store_true", help=lang.get('cli_allow_non_disk_help'))
+    parser.add_argument("--job-file", type=str, metavar="FILE", help=lang.get('cli_job_file_help'))
     
     # 添加输出选项
     parser.add_argument("--output", "-o", type=str, help=lang.get('cli_output_help'))
@@ -45,8 +51,12 @@ def parse_args():
     if args.language:
         lang.set_language(args.language)
     
+    # 指定了作业文件时运行磁盘作业引擎
+    if args.job_file and 'disk_jobs' not in args.extended:
+        args.extended.append('disk_jobs')
+    
     # 如果没有指定任何测试，默认运行所有测试
-    if not (args.cpu or args.memory or args.disk or args.gpu or args.all):
+    if not (args.cpu or args.memory or args.disk or args.gpu or args.all or args.extended):
         args.all = True
     
     return args
@@ -58,7 +68,8 @@ def main():
     args = parse_args()
     
     # 创建性能测试实例
-    benchmark = PerformanceBenchmark()
+    benchmark = PerformanceBenchmark(disk_targets=args.disk_target, allow_non_disk=args.allow_non_disk,
+                                     job_file=args.job_file)
     
     # 设置输出文件
     output_file = args.output if args.output else "benchmark_report.json"
@@ -77,6 +88,11 @@ def main():
         if args.all:
             # 运行所有测试
             benchmark.run_all_tests()
+            
+            # 扩展测试在全部测试之后运行，并重新生成报告
+            if args.extended:
+                benchmark.run_extended_tests(args.extended)
+                benchmark.generate_report(output_file)
         else:
             # 运行选定的测试
             if not args.quiet:
@@ -98,6 +114,7 @@ def main():
                     print(lang.get('memory_test'))
                     print("=" * 60)
                 benchmark.results['memory'] = benchmark.memory_test()
+                benchmark.results['memory_bandwidth'] = benchmark.memory_bandwidth_test()
             
             # 磁盘I/O测试
             if args.disk:
@@ -115,6 +132,12 @@ def main():
                     print("=" * 60)
                 benchmark.results['gpu'] = benchmark.gpu_test()
             
+            # 扩展测试
+            if args.extended:
+                if not args.quiet:
+                    print()
+                benchmark.run_extended_tests(args.extended)
+            
             # 生成报告
             if not args.quiet:
                 print("\n" + "=" * 60)
@@ -137,4 +160,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # 打包为可执行文件后，进程池工作者需要此调用
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
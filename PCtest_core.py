@@ -11,25 +11,67 @@ import time
 
 # 导入各个测试模块
 from system_info import get_system_info, print_system_info
-from cpu_test import cpu_single_thread_test, cpu_multi_thread_test
-from memory_test import memory_test
-from disk_test import disk_io_test
+from cpu_test import cpu_single_thread_test, cpu_multi_thread_test, cpu_executor_comparison_test
+from memory_test import (memory_test, stream_bandwidth_test, memory_latency_test,
+                         shared_memory_bandwidth_test, page_fault_test, access_pattern_test,
+                         numa_matrix_test, object_gc_test, buffer_copy_test, memtest_soak_test,
+                         loaded_latency_test)
+from disk_test import (disk_io_test, multi_target_disk_test, random_iops_test, block_size_sweep_test, mmap_io_test,
+                       metadata_test, parallel_stream_test, durable_write_test, preallocation_test,
+                       copy_path_test, run_disk_jobs)
 from gpu_test import gpu_test
 from report_generator import calculate_scores, print_report, save_report
 
 # 导入多语言支持模块
 import language as lang
 
+# 扩展测试：不计入综合得分，需显式选择运行（名称 -> PerformanceBenchmark方法名）
+EXTENDED_TESTS = {
+    'cpu_executors': 'cpu_executor_comparison_test',
+    'memory_latency': 'memory_latency_test',
+    'memory_scaling': 'memory_scaling_test',
+    'page_faults': 'page_fault_test',
+    'memory_access_patterns': 'memory_access_pattern_test',
+    'numa_matrix': 'numa_matrix_test',
+    'object_gc': 'object_gc_test',
+    'buffer_copy': 'buffer_copy_test',
+    'memtest': 'memtest_soak_test',
+    'loaded_latency': 'loaded_latency_test',
+    'disk_targets': 'disk_targets_test',
+    'disk_iops': 'disk_iops_test',
+    'disk_block_sizes': 'disk_block_size_test',
+    'disk_mmap': 'disk_mmap_test',
+    'disk_metadata': 'disk_metadata_test',
+    'disk_parallel': 'disk_parallel_test',
+    'disk_durable_writes': 'disk_durable_write_test',
+    'disk_preallocation': 'disk_preallocation_test',
+    'disk_copy': 'disk_copy_test',
+    'disk_jobs': 'disk_jobs_test',
+}
+
 
 class PerformanceBenchmark:
     """性能测试基准类
     
     整合所有测试功能，提供统一的接口
     """
-    def __init__(self):
-        """初始化性能测试基准类"""
+    def __init__(self, disk_targets=None, allow_non_disk=False, job_file=None):
+        """初始化性能测试基准类
+        
+        Args:
+            disk_targets: 磁盘测试的目录或挂载点列表，None表示自动选择
+            allow_non_disk: 是否将 tmpfs/overlay 目标的结果计入磁盘得分
+            job_file: 磁盘作业引擎使用的JSON作业文件，None表示运行示例作业
+        """
         self.results = {}
         self.system_info = get_system_info()
+        self.disk_targets = disk_targets
+        self.allow_non_disk = allow_non_disk
+        self.job_file = job_file
+    
+    def _disk_directory(self):
+        """单项磁盘测试使用的目录：第一个磁盘测试目标，未指定时为None（自动选择）"""
+        return self.disk_targets[0] if self.disk_targets else None
     
     def print_system_info(self):
         """打印系统信息"""
@@ -45,13 +87,111 @@ class PerformanceBenchmark:
         # calculation_count参数为了兼容性保留，但实际不使用
         return cpu_multi_thread_test(duration, max_threads)
     
-    def memory_test(self, size_mb=200):
-        """运行内存性能测试（降低测试数据量）"""
+    def cpu_executor_comparison_test(self, duration=5, max_threads=None):
+        """运行执行器后端（线程池/进程池/子解释器池）比较测试"""
+        return cpu_executor_comparison_test(duration, max_threads)
+    
+    def memory_test(self, size_mb=None):
+        """运行内存性能测试（测试量根据有效内存限制自动确定）"""
         return memory_test(size_mb)
     
+    def memory_bandwidth_test(self, array_mb=None):
+        """运行STREAM内存带宽测试"""
+        return stream_bandwidth_test(array_mb)
+    
+    def memory_latency_test(self, max_mb=None):
+        """运行指针追逐内存延迟测试"""
+        return memory_latency_test(max_mb=max_mb)
+    
+    def memory_scaling_test(self, max_processes=None):
+        """运行多进程共享内存带宽扩展测试"""
+        return shared_memory_bandwidth_test(max_processes)
+    
+    def page_fault_test(self, size_mb=256):
+        """运行缺页、首次访问与大页开销测试"""
+        return page_fault_test(size_mb)
+    
+    def memory_access_pattern_test(self, array_mb=None):
+        """运行内存步长与块顺序访问模式测试"""
+        return access_pattern_test(array_mb)
+    
+    def numa_matrix_test(self, region_mb=None):
+        """运行NUMA节点间内存延迟与带宽矩阵测试"""
+        return numa_matrix_test(region_mb)
+    
+    def object_gc_test(self, object_count=200000):
+        """运行Python对象分配与GC暂停测试"""
+        return object_gc_test(object_count)
+    
+    def buffer_copy_test(self):
+        """运行拷贝与零拷贝缓冲区操作对比测试"""
+        return buffer_copy_test()
+    
+    def memtest_soak_test(self, fraction=0.5, passes=3):
+        """运行内存完整性老化测试"""
+        return memtest_soak_test(fraction, passes)
+    
+    def loaded_latency_test(self, max_workers=None):
+        """运行负载下的内存延迟测试"""
+        return loaded_latency_test(max_workers)
+    
     def disk_io_test(self, file_size_mb=50):
-        """运行磁盘I/O性能测试（降低文件大小）"""
-        return disk_io_test(file_size_mb)
+        """运行磁盘I/O性能测试（降低文件大小）
+        
+        指定了多个测试目标时，各目标的结果保存在 results['disk_targets']，
+        返回第一个可计分目标的结果。
+        """
+        if not self.disk_targets:
+            return disk_io_test(file_size_mb, allow_non_disk=self.allow_non_disk)
+        if len(self.disk_targets) == 1:
+            return disk_io_test(file_size_mb, directory=self._disk_directory(), allow_non_disk=self.allow_non_disk)
+
+        self.results['disk_targets'] = self.disk_targets_test(file_size_mb)
+        tested = [entry['result'] for entry in self.results['disk_targets'] if 'result' in entry]
+        for result in tested:
+            if self.allow_non_disk or not result['target']['non_disk']:
+                return result
+        return tested[0] if tested else None
+    
+    def disk_targets_test(self, file_size_mb=50):
+        """运行多目标磁盘I/O测试（未指定目标时测试所有发现的磁盘挂载点）"""
+        return multi_target_disk_test(self.disk_targets, file_size_mb, self.allow_non_disk)
+    
+    def disk_iops_test(self, file_size_mb=256, block_size=4096):
+        """运行随机读写IOPS测试"""
+        return random_iops_test(file_size_mb, block_size, directory=self._disk_directory())
+    
+    def disk_block_size_test(self, total_mb=256):
+        """运行顺序I/O块大小扫描测试"""
+        return block_size_sweep_test(total_mb, directory=self._disk_directory())
+    
+    def disk_mmap_test(self, file_size_mb=256):
+        """运行内存映射文件I/O测试"""
+        return mmap_io_test(file_size_mb, directory=self._disk_directory())
+    
+    def disk_metadata_test(self, file_count=20000):
+        """运行文件系统元数据测试"""
+        return metadata_test(file_count, directory=self._disk_directory())
+    
+    def disk_parallel_test(self, file_size_mb=64, executor='thread'):
+        """运行并行多流顺序I/O测试"""
+        return parallel_stream_test(file_size_mb=file_size_mb, executor=executor, directory=self._disk_directory())
+    
+    def disk_durable_write_test(self, duration=2.0):
+        """运行持久化写入（fsync/fdatasync/O_DSYNC）延迟测试"""
+        return durable_write_test(duration=duration, directory=self._disk_directory())
+    
+    def disk_preallocation_test(self, file_size_mb=256):
+        """运行预分配与稀疏文件写入测试"""
+        return preallocation_test(file_size_mb, directory=self._disk_directory())
+    
+    def disk_copy_test(self, file_size_mb=512):
+        """运行文件复制路径测试"""
+        return copy_path_test(file_size_mb, directory=self._disk_directory())
+    
+    def disk_jobs_test(self):
+        """运行fio风格的磁盘作业（作业文件或示例作业）"""
+        return run_disk_jobs(job_file=self.job_file, directory=self._disk_directory())
     
     def gpu_test(self, max_load=0.7):
         """运行GPU性能测试"""
@@ -79,6 +219,8 @@ class PerformanceBenchmark:
             print("=" * 60)
             self.results['memory'] = self.memory_test()
             print()
+            self.results['memory_bandwidth'] = self.memory_bandwidth_test()
+            print()
 
             # 磁盘I/O测试
             print("=" * 60)
@@ -106,6 +248,22 @@ class PerformanceBenchmark:
             traceback.print_exc()
             sys.exit(1)
     
+    def run_extended_tests(self, names):
+        """运行选定的扩展测试，结果以测试名称为键保存
+        
+        单个测试出错时记录 {'error': 错误信息} 并继续运行其余测试，已完成的结果不会丢失。
+        """
+        for name in names:
+            print("=" * 60)
+            print(name)
+            print("=" * 60)
+            try:
+                self.results[name] = getattr(self, EXTENDED_TESTS[name])()
+            except Exception as e:
+                print(f"  {name} 测试失败: {e}")
+                self.results[name] = {'error': str(e)}
+            print()
+    
     def generate_scores(self):
         """计算性能得分"""
         return calculate_scores(self.results)
@@ -329,6 +329,7 @@ class PCTestDearPyGUI:
                 results['memory'] = self.benchmark.memory_test(
                     size_mb=memory_params['size_mb']
                 )
+                results['memory_bandwidth'] = self.benchmark.memory_bandwidth_test()
                 self.update_progress(60)
             
             # 磁盘测试
@@ -91,6 +91,7 @@ class BenchmarkThread(QThread):
                 results['memory'] = self.benchmark.memory_test(
                     size_mb=memory_params['size_mb']
                 )
+                results['memory_bandwidth'] = self.benchmark.memory_bandwidth_test()
                 self.progress_signal.emit(60)
             
             # 磁盘测试
@@ -7,8 +7,31 @@ CPU性能测试模块
 
 import time
 import math
+import threading
 import psutil
-from concurrent.futures import ThreadPoolExecutor
+import concurrent.futures
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from cpu_workers import multi_thread_worker_task, hold_task
+
+# Python 3.14+ 提供基于子解释器（每个解释器独立GIL）的执行器
+HAS_INTERPRETER_POOL = hasattr(concurrent.futures, 'InterpreterPoolExecutor')
+
+EXECUTOR_BACKENDS = {
+    'thread': ThreadPoolExecutor,
+    'process': ProcessPoolExecutor,
+}
+if HAS_INTERPRETER_POOL:
+    EXECUTOR_BACKENDS['interpreter'] = concurrent.futures.InterpreterPoolExecutor
+
+# 预热任务在非线程后端上占住工作者的时长（秒），启动开销中会扣除这段时间
+STARTUP_HOLD_SECONDS = 0.2
+
+EXECUTOR_LABELS = {
+    'thread': '线程池',
+    'process': '进程池',
+    'interpreter': '子解释器池',
+}
 
 
 def cpu_single_thread_test(duration=20):
@@ -58,25 +81,33 @@ def cpu_single_thread_test(duration=20):
     }
 
 
-def cpu_multi_thread_test(duration=5, max_threads=2):
+def _process_tree_rss():
+    """返回当前进程及其子进程的常驻内存总量（字节）"""
+    process = psutil.Process()
+    rss = process.memory_info().rss
+    for child in process.children(recursive=True):
+        try:
+            rss += child.memory_info().rss
+        except psutil.Error:
+            pass
+    return rss
+
+
+def cpu_multi_thread_test(duration=5, max_threads=2, executor='thread'):
     """多线程CPU测试（优化为低配置硬件）
     
     Args:
         duration: 测试持续时间（秒）
         max_threads: 最大线程数（限制为2以避免跑满CPU）
+        executor: 执行器后端（'thread'、'process' 或 'interpreter'）
         
     Returns:
         dict: 包含测试结果的字典
     """
-    print("正在进行多线程CPU测试...")
+    if executor not in EXECUTOR_BACKENDS:
+        raise ValueError(f"不支持的执行器后端: {executor}（可用: {', '.join(EXECUTOR_BACKENDS)}）")
 
-    def worker_task():
-        """工作线程任务（降低计算强度）"""
-        count = 0
-        # 降低计算量以适配低配置硬件
-        for i in range(500000):  # 从2000000降低到500000
-            count += abs(math.sqrt(i) * math.sin(i))
-        return count
+    print(f"正在进行多线程CPU测试（{EXECUTOR_LABELS[executor]}）...")
 
     # 确保num_threads不为None
     if max_threads is None or max_threads <= 0:
@@ -84,29 +115,103 @@ def cpu_multi_thread_test(duration=5, max_threads=2):
     else:
         num_threads = max_threads
 
+    baseline_rss = _process_tree_rss()
+
+    # 启动开销：创建执行器并确保 num_threads 个工作者全部启动。
+    # 执行器只在没有空闲工作者时才启动新的工作者，因此预热任务必须阻塞到全部提交完成：
+    # 线程池使用 threading.Barrier；进程池和子解释器池无法共享Barrier，
+    # 改为让每个任务占住工作者 STARTUP_HOLD_SECONDS 秒，并从启动开销中扣除
     start_time = time.time()
-    with ThreadPoolExecutor(max_workers=num_threads) as executor:
-        futures = [executor.submit(worker_task) for _ in range(num_threads)]
+    pool = EXECUTOR_BACKENDS[executor](max_workers=num_threads)
+    try:
+        if executor == 'thread':
+            barrier = threading.Barrier(num_threads, timeout=60)
+            warmup = [pool.submit(barrier.wait) for _ in range(num_threads)]
+            hold_time = 0.0
+        else:
+            warmup = [pool.submit(hold_task, STARTUP_HOLD_SECONDS) for _ in range(num_threads)]
+            hold_time = STARTUP_HOLD_SECONDS
+        for future in warmup:
+            future.result()
+        startup_time = max(0.0, time.time() - start_time - hold_time)
+        worker_memory = max(0, _process_tree_rss() - baseline_rss)
+
+        start_time = time.time()
+        futures = [pool.submit(multi_thread_worker_task) for _ in range(num_threads)]
         results = [future.result() for future in futures]
-    end_time = time.time()
+        end_time = time.time()
+    finally:
+        pool.shutdown(wait=True)
 
     elapsed_time = end_time - start_time
     total_operations = sum(results)
     operations_per_second = total_operations / elapsed_time
 
-    print(f"多线程CPU测试完成 (使用 {num_threads} 个线程):")
+    print(f"多线程CPU测试完成 (使用 {num_threads} 个{EXECUTOR_LABELS[executor]}工作者):")
     print(f"  总计算量: {total_operations:.0f}")
+    print(f"  启动开销: {startup_time * 1000:.2f} 毫秒")
+    print(f"  工作者内存开销: {worker_memory / (1024 * 1024):.2f} MB")
     print(f"  耗时: {elapsed_time:.2f} 秒")
     print(f"  性能: {operations_per_second:.0f} 操作/秒")
 
     return {
+        'executor': executor,
         'threads_used': num_threads,
+        'startup_time': startup_time,
+        'worker_memory_bytes': worker_memory,
         'total_operations': total_operations,
         'time_taken': elapsed_time,
         'operations_per_second': operations_per_second
     }
 
 
+def cpu_executor_comparison_test(duration=5, max_threads=None):
+    """比较线程池、进程池和子解释器池三种执行器后端
+    
+    子解释器池（每个解释器独立GIL）仅在提供
+    concurrent.futures.InterpreterPoolExecutor 的Python版本上可用。
+    
+    Args:
+        duration: 测试持续时间（秒）
+        max_threads: 工作者数量（None或0表示使用全部逻辑CPU）
+        
+    Returns:
+        dict: 以后端名称为键的测试结果字典
+    """
+    print("正在比较多线程CPU测试的执行器后端...")
+
+    results = {}
+    for backend in ('thread', 'process', 'interpreter'):
+        if backend not in EXECUTOR_BACKENDS:
+            print(f"  {EXECUTOR_LABELS[backend]}: 当前Python版本不支持，跳过")
+            results[backend] = {'available': False}
+            continue
+        try:
+            result = cpu_multi_thread_test(duration, max_threads, executor=backend)
+            result['available'] = True
+        except Exception as e:
+            print(f"  {EXECUTOR_LABELS[backend]}测试失败: {e}")
+            result = {'available': False, 'error': str(e)}
+        results[backend] = result
+        print()
+
+    # 以线程池为基准计算加速比
+    baseline = results.get('thread', {}).get('operations_per_second')
+    if baseline:
+        for result in results.values():
+            if 'operations_per_second' in result:
+                result['speedup_vs_thread'] = result['operations_per_second'] / baseline
+
+    print("执行器后端比较结果:")
+    for backend, result in results.items():
+        if result.get('available'):
+            print(f"  {EXECUTOR_LABELS[backend]}: {result['operations_per_second']:.0f} 操作/秒, "
+                  f"启动开销 {result['startup_time'] * 1000:.2f} 毫秒, "
+                  f"加速比 {result.get('speedup_vs_thread', 0):.2f}x")
+
+    return results
+
+
 if __name__ == "__main__":
     # 测试代码
     import psutil
@@ -120,4 +225,8 @@ if __name__ == "__main__":
     
     # 多线程测试
     logical_cpu_count = psutil.cpu_count(logical=True)
-    multi_result = cpu_multi_thread_test(logical_cpu_count)
\ No newline at end of file
+    multi_result = cpu_multi_thread_test(max_threads=logical_cpu_count)
+    print()
+    
+    # 执行器后端比较
+    comparison_result = cpu_executor_comparison_test(max_threads=logical_cpu_count)
\ No newline at end of file
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CPU测试工作负载模块
+只依赖标准库，可被线程池、进程池和子解释器池中的工作者导入执行
+"""
+
+import math
+import time
+
+
+def multi_thread_worker_task(iterations=500000):
+    """多线程CPU测试的工作任务（降低计算强度）
+
+    Args:
+        iterations: 循环次数
+
+    Returns:
+        float: 计算结果累加值
+    """
+    count = 0
+    for i in range(iterations):
+        count += abs(math.sqrt(i) * math.sin(i))
+    return count
+
+
+def hold_task(seconds):
+    """占住工作者一段时间，使执行器为每个提交的任务都启动新的工作者"""
+    time.sleep(seconds)
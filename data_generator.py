@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试数据生成模块
+快速生成可控压缩率、逐块唯一的测试数据，复用预分配缓冲区
+"""
+
+import os
+
+import numpy as np
+
+# 压缩率和去重按该粒度控制（常见的文件系统块/去重块大小）
+SEGMENT_SIZE = 4096
+# 每个段开头写入的块序号占用的字节数
+STAMP_SIZE = 8
+
+
+def random_bytes(size, rng=None):
+    """生成随机字节
+
+    Args:
+        size: 字节数
+        rng: NumPy随机数生成器，为None时使用 os.urandom
+
+    Returns:
+        bytes: 随机字节
+    """
+    if rng is None:
+        return os.urandom(size)
+    return rng.bytes(size)
+
+
+class DataGenerator:
+    """测试数据生成器
+
+    每个 SEGMENT_SIZE 段的前一部分为随机数据、其余为零，
+    从而在压缩算法的窗口内均匀地达到目标压缩率。
+    unique为True时在每个段开头写入递增的块序号，使每个块内容都不同，
+    避免去重和压缩存储虚高测试结果，而不必为每个块重新生成随机数据。
+
+    Args:
+        block_size: 块大小（字节）
+        compressibility: 可压缩比例，0.0为不可压缩，0.5为约50%可压缩，1.0为全零
+        unique: 是否让每个块内容唯一
+        seed: 随机种子，为None时使用 os.urandom，否则使用可复现的NumPy生成器
+        buffer: 可选的预分配可写缓冲区（如O_DIRECT需要的页对齐mmap），为None时自动分配
+    """
+
+    def __init__(self, block_size=1024 * 1024, compressibility=0.0, unique=True, seed=None, buffer=None):
+        if not 0.0 <= compressibility <= 1.0:
+            raise ValueError("compressibility 必须在 0.0 到 1.0 之间")
+        self.block_size = block_size
+        self.compressibility = compressibility
+        self.unique = unique
+        self.rng = None if seed is None else np.random.default_rng(seed)
+        self.view = memoryview(bytearray(block_size) if buffer is None else buffer)[:block_size]
+        self.blocks = 0
+
+        segment_size = min(SEGMENT_SIZE, block_size)
+        random_size = round(segment_size * (1.0 - compressibility))
+        if unique:
+            random_size = max(random_size, min(STAMP_SIZE, segment_size))
+        self._segment_size = segment_size
+        self._random_size = random_size
+        self.refill()
+
+    def refill(self):
+        """重新生成整个缓冲区的随机内容"""
+        array = np.frombuffer(self.view, dtype=np.uint8)
+        segments = len(array) // self._segment_size
+        body = array[:segments * self._segment_size].reshape(segments, self._segment_size)
+        body[:, :self._random_size] = np.frombuffer(
+            random_bytes(segments * self._random_size, self.rng), dtype=np.uint8
+        ).reshape(segments, self._random_size)
+        body[:, self._random_size:] = 0
+        tail = array[segments * self._segment_size:]
+        if len(tail):
+            tail[:] = np.frombuffer(random_bytes(len(tail), self.rng), dtype=np.uint8)
+        # 段开头的序号列，用于逐块标记
+        self._stamps = body[:, :STAMP_SIZE] if self.unique and self._random_size >= STAMP_SIZE else None
+
+    def next_block(self):
+        """返回下一个块的数据（指向内部缓冲区的memoryview，下一次调用时会被改写）"""
+        if self._stamps is not None:
+            stamp = np.frombuffer(self.blocks.to_bytes(STAMP_SIZE, 'little'), dtype=np.uint8)
+            self._stamps[:] = stamp
+        self.blocks += 1
+        return self.view
+
+    def close(self):
+        """释放对缓冲区的引用（外部传入的mmap缓冲区需要先调用此方法才能关闭）"""
+        self._stamps = None
+        self.view.release()
@@ -2,74 +2,1481 @@
 # -*- coding: utf-8 -*-
 """
 磁盘I/O性能测试模块
-测试磁盘读写速度
+测试磁盘读写速度，每次I/O操作的延迟都记录到固定内存的直方图中
 """
 
 import os
+import json
+import mmap
 import time
 import random
+import itertools
+import shutil
 import tempfile
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
+import numpy as np
+import psutil
 
-def disk_io_test(file_size_mb=50):
+from data_generator import DataGenerator
+from latency_histogram import LatencyHistogram, format_summary
+
+
+# 基于内存或叠加层的文件系统：测试结果不代表底层磁盘性能
+NON_DISK_FSTYPES = {
+    'tmpfs': '内存文件系统',
+    'ramfs': '内存文件系统',
+    'devtmpfs': '内存文件系统',
+    'overlay': '叠加文件系统',
+    'overlayfs': '叠加文件系统',
+    'aufs': '叠加文件系统',
+}
+
+# 自动发现磁盘目标时跳过的系统挂载点和容量下限（显式指定的目标不受限制）
+SYSTEM_MOUNTPOINTS = ('/boot', '/boot/efi', '/efi')
+MIN_DISCOVERED_TARGET_BYTES = 4 * 1024 ** 3
+
+
+def _mount_info(partition):
+    """将 psutil 分区信息转换为测试目标字典"""
+    return {
+        'device': partition.device,
+        'mountpoint': partition.mountpoint,
+        'fstype': partition.fstype,
+        'non_disk': partition.fstype.lower() in NON_DISK_FSTYPES
+    }
+
+
+def list_disk_targets():
+    """列出可测试的挂载点
+    
+    包括 psutil 识别的物理设备分区，以及 tmpfs/overlay 等挂载点（标记为 non_disk），
+    以便在报告中说明它们的结果不代表磁盘性能。
+    
+    Returns:
+        list: 测试目标字典列表（device、mountpoint、fstype、non_disk）
+    """
+    targets = {}
+    for partition in psutil.disk_partitions(all=False):
+        targets[partition.mountpoint] = _mount_info(partition)
+    for partition in psutil.disk_partitions(all=True):
+        if partition.fstype.lower() in NON_DISK_FSTYPES and partition.mountpoint not in targets:
+            targets[partition.mountpoint] = _mount_info(partition)
+    return sorted(targets.values(), key=lambda target: target['mountpoint'])
+
+
+def find_mount(path):
+    """返回包含 path 的挂载点信息（最长前缀匹配），找不到时文件系统类型为'未知'"""
+    path = os.path.normcase(os.path.realpath(path))
+    best = None
+    for partition in psutil.disk_partitions(all=True):
+        mountpoint = os.path.normcase(partition.mountpoint)
+        if path == mountpoint or path.startswith(mountpoint.rstrip(os.sep) + os.sep):
+            if best is None or len(mountpoint) > len(os.path.normcase(best.mountpoint)):
+                best = partition
+    if best is None:
+        return {'device': '未知', 'mountpoint': path, 'fstype': '未知', 'non_disk': False}
+    return _mount_info(best)
+
+
+def default_test_directory():
+    """选择默认测试目录
+    
+    优先使用系统临时目录；它位于 tmpfs/overlay 上时（许多Linux系统的 /tmp），
+    依次尝试当前目录和用户主目录中第一个可写且位于磁盘上的目录。
+    """
+    candidates = [tempfile.gettempdir(), os.getcwd(), os.path.expanduser('~')]
+    for candidate in candidates:
+        if os.access(candidate, os.W_OK) and not find_mount(candidate)['non_disk']:
+            return candidate
+    return candidates[0]
+
+
+def _drop_file_cache(path):
+    """同步文件并请求内核丢弃其页缓存，平台不支持 posix_fadvise 时返回False"""
+    if not hasattr(os, 'posix_fadvise'):
+        return False
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+    return True
+
+
+def _timed_op(histogram, operation, *args):
+    """执行一次I/O操作并将其耗时（纳秒）记录到直方图，返回操作结果"""
+    start_ns = time.perf_counter_ns()
+    result = operation(*args)
+    histogram.record(time.perf_counter_ns() - start_ns)
+    return result
+
+
+def _timed_write(path, generator, count, histogram, sync_histogram=None):
+    """写入 count 个由 generator 生成的块，返回耗时（秒）
+    
+    提供 sync_histogram 时在计时区域内执行fsync，其延迟单独记录到 sync_histogram。
+    """
+    start_time = time.time()
+    with open(path, 'wb') as f:
+        for _ in range(count):
+            _timed_op(histogram, f.write, generator.next_block())
+        if sync_histogram is not None:
+            f.flush()
+            _timed_op(sync_histogram, os.fsync, f.fileno())
+    return time.time() - start_time
+
+
+def _timed_read(path, histogram, chunk_size=1024 * 1024):
+    """按块顺序读取整个文件，返回耗时（秒）"""
+    start_time = time.time()
+    with open(path, 'rb') as f:
+        while _timed_op(histogram, f.read, chunk_size):
+            pass
+    return time.time() - start_time
+
+
+def _direct_io_test(path, file_size_mb, write_histogram, read_histogram, sync_histogram,
+                    chunk_size=1024 * 1024):
+    """使用 O_DIRECT 和页对齐的mmap缓冲区进行顺序写入和读取，写入后的fsync延迟记录到 sync_histogram
+    
+    Returns:
+        tuple: (写入耗时, 读取耗时)；平台或文件系统不支持 O_DIRECT 时返回None
+    """
+    if not hasattr(os, 'O_DIRECT'):
+        return None
+
+    # 匿名mmap按页对齐，满足 O_DIRECT 对缓冲区地址和长度的对齐要求
+    buffer = mmap.mmap(-1, chunk_size)
+    generator = DataGenerator(chunk_size, buffer=buffer)
+    try:
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_DIRECT)
+        except OSError:
+            return None
+        try:
+            start_time = time.time()
+            for _ in range(file_size_mb):
+                _timed_op(write_histogram, os.write, fd, generator.next_block())
+            _timed_op(sync_histogram, os.fsync, fd)
+            write_time = time.time() - start_time
+        except OSError:
+            return None
+        finally:
+            os.close(fd)
+
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECT)
+        try:
+            start_time = time.time()
+            while _timed_op(read_histogram, os.readv, fd, [buffer]):
+                pass
+            read_time = time.time() - start_time
+        finally:
+            os.close(fd)
+        return write_time, read_time
+    finally:
+        generator.close()
+        buffer.close()
+
+
+def disk_io_test(file_size_mb=50, compressibility=0.0, directory=None, allow_non_disk=False):
     """磁盘I/O性能测试（优化为低配置硬件）
     
+    分别报告经过页缓存的速度和绕过页缓存的速度：
+    计时区域内包含fsync的写入、posix_fadvise(POSIX_FADV_DONTNEED)后的读取，
+    以及文件系统支持时使用 O_DIRECT 的读写。
+    写入的每个块内容都不同，避免去重或压缩存储虚高测试结果。
+    结果中记录测试目录所在的挂载点和文件系统类型，tmpfs/overlay 目标会被标记，
+    除非 allow_non_disk 为True，否则不计入磁盘得分。
+    
     Args:
         file_size_mb: 测试文件大小（MB，默认降低到50MB）
+        compressibility: 写入数据的可压缩比例（0.0为不可压缩，1.0为全零）
+        directory: 测试文件所在目录，None表示自动选择位于磁盘上的目录
+        allow_non_disk: 是否允许将 tmpfs/overlay 目标的结果计入磁盘得分
         
     Returns:
-        dict: 包含测试结果的字典
+        dict: 包含测试结果的字典，不支持的模式对应的值为None
     """
     print(f"正在进行磁盘I/O测试 (文件大小: {file_size_mb}MB)...")
 
-    test_file = os.path.join(tempfile.gettempdir(), 'benchmark_test.dat')
+    directory = directory or default_test_directory()
+    target = find_mount(directory)
+    print(f"  测试目录: {directory}（挂载点 {target['mountpoint']}，{target['fstype']}，设备 {target['device']}）")
+    if target['non_disk']:
+        print(f"  警告: {target['fstype']} 是{NON_DISK_FSTYPES[target['fstype'].lower()]}，结果不代表磁盘性能"
+              + ("" if allow_non_disk else "，不计入磁盘得分"))
+    test_file = os.path.join(directory, 'benchmark_test.dat')
     file_size = file_size_mb * 1024 * 1024  # 转换为字节
 
     try:
         # 写入测试
         print("  测试写入性能...")
-        data = bytearray(random.getrandbits(8) for _ in range(1024 * 1024))  # 1MB随机数据
+        generator = DataGenerator(1024 * 1024, compressibility=compressibility)  # 1MB块，逐块唯一
 
-        start_time = time.time()
-        with open(test_file, 'wb') as f:
-            for _ in range(file_size_mb):
-                f.write(data)
-        end_time = time.time()
-
-        write_time = end_time - start_time
+        histograms = {phase: LatencyHistogram() for phase in
+                      ('write', 'read', 'write_sync', 'fsync', 'read_uncached',
+                       'direct_write', 'direct_fsync', 'direct_read')}
+        write_time = _timed_write(test_file, generator, file_size_mb, histograms['write'])
         write_speed = file_size_mb / write_time
 
         print(f"    写入时间: {write_time:.2f} 秒")
-        print(f"    写入速度: {write_speed:.2f} MB/s")
+        print(f"    写入速度: {write_speed:.2f} MB/s（页缓存）")
 
         # 读取测试
         print("  测试读取性能...")
-        start_time = time.time()
-        with open(test_file, 'rb') as f:
-            while f.read(1024 * 1024):  # 每次读取1MB
-                pass
-        end_time = time.time()
-
-        read_time = end_time - start_time
+        read_time = _timed_read(test_file, histograms['read'])
         read_speed = file_size_mb / read_time
 
         print(f"    读取时间: {read_time:.2f} 秒")
-        print(f"    读取速度: {read_speed:.2f} MB/s")
+        print(f"    读取速度: {read_speed:.2f} MB/s（页缓存）")
+
+        # 计时区域内包含fsync，数据写入设备后才停止计时
+        print("  测试同步写入性能...")
+        write_sync_time = _timed_write(test_file, generator, file_size_mb, histograms['write_sync'],
+                                       sync_histogram=histograms['fsync'])
+        write_sync_speed = file_size_mb / write_sync_time
+        print(f"    写入速度: {write_sync_speed:.2f} MB/s（含fsync）")
+
+        # 丢弃页缓存后读取
+        print("  测试无缓存读取性能...")
+        read_uncached_time = None
+        read_uncached_speed = None
+        if _drop_file_cache(test_file):
+            read_uncached_time = _timed_read(test_file, histograms['read_uncached'])
+            read_uncached_speed = file_size_mb / read_uncached_time
+            print(f"    读取速度: {read_uncached_speed:.2f} MB/s（POSIX_FADV_DONTNEED后）")
+        else:
+            print("    当前平台不支持 posix_fadvise，跳过")
+
+        print("  测试 O_DIRECT 读写性能...")
+        direct_write_speed = None
+        direct_read_speed = None
+        direct_times = _direct_io_test(test_file, file_size_mb,
+                                       histograms['direct_write'], histograms['direct_read'],
+                                       histograms['direct_fsync'])
+        if direct_times:
+            direct_write_speed = file_size_mb / direct_times[0]
+            direct_read_speed = file_size_mb / direct_times[1]
+            print(f"    写入速度: {direct_write_speed:.2f} MB/s，读取速度: {direct_read_speed:.2f} MB/s（O_DIRECT）")
+        else:
+            print("    当前平台或文件系统不支持 O_DIRECT，跳过")
+
+        latency = {phase: histogram.summary() for phase, histogram in histograms.items() if histogram.count}
+        print("  逐次I/O延迟:")
+        for phase, summary in latency.items():
+            print(f"    {phase:<14} {format_summary(summary)}")
 
         return {
             'file_size_mb': file_size_mb,
             'write_time': write_time,
             'write_speed_mb_s': write_speed,
             'read_time': read_time,
-            'read_speed_mb_s': read_speed
+            'read_speed_mb_s': read_speed,
+            'write_sync_time': write_sync_time,
+            'write_sync_speed_mb_s': write_sync_speed,
+            'read_uncached_time': read_uncached_time,
+            'read_uncached_speed_mb_s': read_uncached_speed,
+            'direct_write_speed_mb_s': direct_write_speed,
+            'direct_read_speed_mb_s': direct_read_speed,
+            'compressibility': compressibility,
+            'directory': directory,
+            'target': target,
+            'allow_non_disk': allow_non_disk,
+            'latency': latency
+        }
+
+    finally:
+        # 清理测试文件
+        if os.path.exists(test_file):
+            os.remove(test_file)
+
+
+def _discovered_target_skip_reason(target, file_size_mb):
+    """判断自动发现的挂载点是否应跳过，返回跳过原因，应测试时返回None"""
+    if target['mountpoint'] in SYSTEM_MOUNTPOINTS:
+        return '系统挂载点'
+    try:
+        usage = psutil.disk_usage(target['mountpoint'])
+    except OSError:
+        return '无法读取容量'
+    if usage.total < MIN_DISCOVERED_TARGET_BYTES:
+        return f"容量小于 {MIN_DISCOVERED_TARGET_BYTES // 1024 ** 3}GB"
+    # 测试文件加上余量
+    if usage.free < 2 * file_size_mb * 1024 * 1024:
+        return '剩余空间不足'
+    return None
+
+
+def multi_target_disk_test(paths=None, file_size_mb=50, allow_non_disk=False):
+    """对多个挂载点分别运行磁盘I/O测试
+    
+    Args:
+        paths: 要测试的目录或挂载点列表，None表示 list_disk_targets() 发现的全部磁盘挂载点
+        file_size_mb: 每个目标的测试文件大小（MB）
+        allow_non_disk: 是否测试并计分 tmpfs/overlay 目标；为False时未显式指定的此类目标会被跳过
+        
+    自动发现目标时，还会跳过 /boot 等系统挂载点、容量过小或剩余空间不足的挂载点；
+    显式指定的目标不受这些限制。单个目标出错不会中断其余目标的测试。
+    
+    Returns:
+        list: 每个目标一项，包含挂载点信息和 disk_io_test 结果（跳过时为 skipped 原因，出错时为 error）
+    """
+    discovered = paths is None
+    if discovered:
+        paths = [target['mountpoint'] for target in list_disk_targets()
+                 if allow_non_disk or not target['non_disk']]
+    print(f"正在进行多目标磁盘I/O测试 (目标数: {len(paths)})...")
+
+    results = []
+    for path in paths:
+        target = find_mount(path)
+        entry = {'path': path, 'target': target}
+        results.append(entry)
+        if not os.path.isdir(path) or not os.access(path, os.W_OK):
+            skipped = '目录不存在或不可写'
+        else:
+            skipped = _discovered_target_skip_reason(target, file_size_mb) if discovered else None
+        if skipped:
+            entry['skipped'] = skipped
+            print(f"  {path}: {skipped}，跳过")
+            continue
+
+        try:
+            # 在目标内创建独立的临时目录，避免与已有文件冲突
+            work_dir = tempfile.mkdtemp(prefix='benchmark_disk_', dir=path)
+            try:
+                entry['result'] = disk_io_test(file_size_mb, directory=work_dir, allow_non_disk=allow_non_disk)
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+        except OSError as e:
+            entry['error'] = str(e)
+            print(f"  {path}: 测试出错（{e}）")
+        print()
+
+    print("  各目标结果:")
+    for entry in results:
+        target = entry['target']
+        label = f"{entry['path']}（{target['fstype']}，{target['device']}）"
+        if 'error' in entry:
+            print(f"    {label}: 出错（{entry['error']}）")
+            continue
+        if 'result' not in entry:
+            print(f"    {label}: 跳过（{entry['skipped']}）")
+            continue
+        result = entry['result']
+        write_speed = result['write_sync_speed_mb_s']
+        read_speed = result['read_uncached_speed_mb_s'] or result['direct_read_speed_mb_s'] or result['read_speed_mb_s']
+        flag = "  [非磁盘]" if target['non_disk'] else ""
+        print(f"    {label}: 写入 {write_speed:.2f} MB/s  读取 {read_speed:.2f} MB/s{flag}")
+
+    return results
+
+
+def block_size_sweep_test(total_mb=256, block_sizes_kb=(4, 16, 64, 256, 1024, 4096, 16384), directory=None):
+    """顺序I/O块大小扫描测试
+    
+    以固定的总数据量，分别用4KB到16MB的块大小顺序写入和读取测试文件。
+    文件以无缓冲方式打开，每个块对应一次系统调用；写入计时包含fsync，读取前丢弃页缓存。
+    
+    Args:
+        total_mb: 每个块大小写入和读取的总数据量（MB）
+        block_sizes_kb: 块大小列表（KB）
+        directory: 测试文件所在目录，None表示自动选择位于磁盘上的目录
+        
+    Returns:
+        dict: 包含各块大小读写速度的字典
+    """
+    print(f"正在进行顺序I/O块大小扫描测试 (总数据量: {total_mb}MB)...")
+
+    directory = directory or default_test_directory()
+    test_file = os.path.join(directory, 'benchmark_blocksize_test.dat')
+    total_size = total_mb * 1024 * 1024
+    results = {'total_mb': total_mb, 'page_cache_dropped': hasattr(os, 'posix_fadvise'),
+               'target': find_mount(directory), 'blocks': []}
+    print(f"  文件系统: {results['target']['fstype']}（挂载点 {results['target']['mountpoint']}）")
+
+    try:
+        for block_kb in block_sizes_kb:
+            block_size = block_kb * 1024
+            count = max(1, total_size // block_size)
+            generator = DataGenerator(block_size)
+            write_histogram = LatencyHistogram()
+            sync_histogram = LatencyHistogram()
+            read_histogram = LatencyHistogram()
+
+            start_time = time.time()
+            with open(test_file, 'wb', buffering=0) as f:
+                for _ in range(count):
+                    _timed_op(write_histogram, f.write, generator.next_block())
+                _timed_op(sync_histogram, os.fsync, f.fileno())
+            write_time = time.time() - start_time
+
+            _drop_file_cache(test_file)
+            start_time = time.time()
+            with open(test_file, 'rb', buffering=0) as f:
+                while _timed_op(read_histogram, f.readinto, generator.view):
+                    pass
+            read_time = time.time() - start_time
+
+            written_mb = count * block_size / (1024 * 1024)
+            results['blocks'].append({
+                'block_size_kb': block_kb,
+                'write_speed_mb_s': written_mb / write_time,
+                'read_speed_mb_s': written_mb / read_time,
+                'write_latency': write_histogram.summary(),
+                'sync_latency': sync_histogram.summary(),
+                'read_latency': read_histogram.summary()
+            })
+            print(f"    块 {block_kb:>6}KB: 写入 {written_mb / write_time:9.2f} MB/s  读取 {written_mb / read_time:9.2f} MB/s")
+            print(f"      写入延迟: {format_summary(write_histogram.summary())}")
+            print(f"      fsync耗时: {format_summary(sync_histogram.summary())}")
+            print(f"      读取延迟: {format_summary(read_histogram.summary())}")
+
+        return results
+
+    finally:
+        # 清理测试文件
+        if os.path.exists(test_file):
+            os.remove(test_file)
+
+
+def mmap_io_test(file_size_mb=256, random_pages=20000, directory=None, chunk_size=1024 * 1024):
+    """内存映射文件I/O测试
+    
+    通过可写mmap向预分配文件顺序写入并计时 mmap.flush，
+    通过只读mmap顺序读取和随机按页读取，并与 f.write/f.read 和 os.pread 路径对比。
+    每次读取前丢弃文件的页缓存（平台支持时），因此读取包含缺页触发的磁盘I/O。
+    
+    Args:
+        file_size_mb: 测试文件大小（MB）
+        random_pages: 随机读取的页数
+        directory: 测试文件所在目录，None表示自动选择位于磁盘上的目录
+        chunk_size: 顺序读写的块大小（字节）
+        
+    Returns:
+        dict: 包含mmap路径和系统调用路径读写速度的字典
+    """
+    print(f"正在进行内存映射文件I/O测试 (文件大小: {file_size_mb}MB)...")
+
+    directory = directory or default_test_directory()
+    test_file = os.path.join(directory, 'benchmark_mmap_test.dat')
+    file_size = file_size_mb * 1024 * 1024
+    page_size = mmap.PAGESIZE
+    generator = DataGenerator(chunk_size)
+    rng = random.Random(0)
+    page_offsets = [rng.randrange(file_size // page_size) * page_size for _ in range(random_pages)]
+    results = {'file_size_mb': file_size_mb, 'page_size': page_size, 'random_pages': random_pages,
+               'target': find_mount(directory)}
+    print(f"  文件系统: {results['target']['fstype']}（挂载点 {results['target']['mountpoint']}）")
+    histograms = {phase: LatencyHistogram() for phase in
+                  ('mmap_write', 'mmap_flush', 'mmap_read', 'mmap_random_read',
+                   'write', 'fsync', 'read', 'pread_random_read')}
+
+    def copy_into(mapped, offset, chunk):
+        mapped[offset:offset + len(chunk)] = chunk
+
+    try:
+        print("  预分配测试文件...")
+        _create_test_file(test_file, file_size)
+        _drop_file_cache(test_file)
+
+        # mmap顺序写入，flush单独计时
+        with open(test_file, 'r+b') as f:
+            with mmap.mmap(f.fileno(), file_size, access=mmap.ACCESS_WRITE) as mapped:
+                start_time = time.time()
+                for offset in range(0, file_size, chunk_size):
+                    _timed_op(histograms['mmap_write'], copy_into, mapped, offset,
+                              generator.next_block()[:min(chunk_size, file_size - offset)])
+                copy_time = time.time() - start_time
+                start_time = time.time()
+                _timed_op(histograms['mmap_flush'], mapped.flush)
+                flush_time = time.time() - start_time
+
+        # mmap顺序读取
+        _drop_file_cache(test_file)
+        with open(test_file, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                start_time = time.time()
+                for offset in range(0, file_size, chunk_size):
+                    _timed_op(histograms['mmap_read'], mapped.__getitem__, slice(offset, offset + chunk_size))
+                mmap_read_time = time.time() - start_time
+
+        # mmap随机按页读取
+        _drop_file_cache(test_file)
+        with open(test_file, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                start_time = time.time()
+                for offset in page_offsets:
+                    _timed_op(histograms['mmap_random_read'], mapped.__getitem__, slice(offset, offset + page_size))
+                mmap_random_time = time.time() - start_time
+
+        # 系统调用路径对比
+        write_time = _timed_write(test_file, generator, file_size // chunk_size, histograms['write'],
+                                  sync_histogram=histograms['fsync'])
+        _drop_file_cache(test_file)
+        read_time = _timed_read(test_file, histograms['read'], chunk_size)
+
+        syscall_random_time = None
+        if hasattr(os, 'pread'):
+            _drop_file_cache(test_file)
+            fd = os.open(test_file, os.O_RDONLY)
+            try:
+                start_time = time.time()
+                for offset in page_offsets:
+                    _timed_op(histograms['pread_random_read'], os.pread, fd, page_size, offset)
+                syscall_random_time = time.time() - start_time
+            finally:
+                os.close(fd)
+
+        results['mmap'] = {
+            'write_copy_time': copy_time,
+            'flush_time': flush_time,
+            'write_speed_mb_s': file_size_mb / (copy_time + flush_time),
+            'read_speed_mb_s': file_size_mb / mmap_read_time,
+            'random_pages_per_s': random_pages / mmap_random_time
+        }
+        results['syscall'] = {
+            'write_speed_mb_s': file_size_mb / write_time,
+            'read_speed_mb_s': file_size_mb / read_time,
+            'random_pages_per_s': random_pages / syscall_random_time if syscall_random_time else None
+        }
+        results['latency'] = {phase: histogram.summary() for phase, histogram in histograms.items() if histogram.count}
+
+        print(f"    mmap   写入: {results['mmap']['write_speed_mb_s']:9.2f} MB/s"
+              f"（拷贝 {copy_time:.3f} 秒 + flush {flush_time:.3f} 秒）")
+        print(f"    mmap   顺序读取: {results['mmap']['read_speed_mb_s']:9.2f} MB/s  "
+              f"随机读取: {results['mmap']['random_pages_per_s']:.0f} 页/秒")
+        print(f"    系统调用 写入: {results['syscall']['write_speed_mb_s']:9.2f} MB/s（含fsync）")
+        print(f"    系统调用 顺序读取: {results['syscall']['read_speed_mb_s']:9.2f} MB/s"
+              + (f"  随机读取: {results['syscall']['random_pages_per_s']:.0f} 页/秒" if syscall_random_time else ""))
+        print("  逐次I/O延迟:")
+        for phase, summary in results['latency'].items():
+            print(f"    {phase:<18} {format_summary(summary)}")
+
+        return results
+
+    finally:
+        # 清理测试文件
+        if os.path.exists(test_file):
+            os.remove(test_file)
+
+
+def metadata_test(file_count=20000, fanout=16, file_size=1024, directory=None):
+    """文件系统元数据测试
+    
+    在两级嵌套目录（fanout × fanout 个叶子目录）中创建大量小文件，
+    依次测量创建、stat、打开/关闭已有文件、os.scandir 遍历、重命名和删除的速度，
+    每次操作的延迟都记录到直方图中。目录项缓存为热状态，创建后的 os.sync 单独计时。
+    
+    Args:
+        file_count: 小文件数量
+        fanout: 每级目录的子目录数
+        file_size: 每个小文件写入的字节数
+        directory: 测试目录所在位置，None表示自动选择位于磁盘上的目录
+        
+    Returns:
+        dict: 包含各操作ops/s和延迟分布的字典
+    """
+    print(f"正在进行文件系统元数据测试 (文件数: {file_count}, 目录: {fanout}×{fanout})...")
+
+    directory = directory or default_test_directory()
+    root = tempfile.mkdtemp(prefix='benchmark_metadata_', dir=directory)
+    leaf_dirs = [os.path.join(root, f'd{i:03d}', f'd{j:03d}') for i in range(fanout) for j in range(fanout)]
+    paths = [os.path.join(leaf_dirs[index % len(leaf_dirs)], f'f{index:07d}') for index in range(file_count)]
+    payload = DataGenerator(max(file_size, 1)).next_block()[:file_size]
+    results = {'file_count': file_count, 'directories': len(leaf_dirs) + fanout, 'file_size': file_size,
+               'target': find_mount(directory), 'operations': {}}
+    print(f"  文件系统: {results['target']['fstype']}（挂载点 {results['target']['mountpoint']}）")
+
+    def run_phase(name, operation, items):
+        """对每个项目执行一次操作并记录ops/s和延迟"""
+        histogram = LatencyHistogram()
+        start_time = time.perf_counter()
+        for item in items:
+            _timed_op(histogram, operation, item)
+        elapsed_time = time.perf_counter() - start_time
+        results['operations'][name] = {
+            'ops': histogram.count,
+            'time': elapsed_time,
+            'ops_per_s': histogram.count / elapsed_time if elapsed_time else None,
+            'latency': histogram.summary()
+        }
+        print(f"    {name:<10} {histogram.count / elapsed_time:10.0f} ops/s  {format_summary(histogram.summary())}")
+
+    def create(path):
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        try:
+            os.write(fd, payload)
+        finally:
+            os.close(fd)
+
+    def open_close(path):
+        os.close(os.open(path, os.O_RDONLY))
+
+    def rename(pair):
+        os.rename(*pair)
+
+    def walk(path):
+        entries = 0
+        with os.scandir(path) as iterator:
+            for entry in iterator:
+                entries += 1
+                if entry.is_dir(follow_symlinks=False):
+                    entries += walk(entry.path)
+        return entries
+
+    try:
+        run_phase('mkdir', os.makedirs, leaf_dirs)
+        run_phase('create', create, paths)
+
+        if hasattr(os, 'sync'):
+            start_time = time.perf_counter()
+            os.sync()
+            results['sync_time'] = time.perf_counter() - start_time
+            print(f"    os.sync 耗时: {results['sync_time']:.3f} 秒")
+
+        run_phase('stat', os.stat, paths)
+        run_phase('open_close', open_close, paths)
+
+        start_time = time.perf_counter()
+        entries = walk(root)
+        scandir_time = time.perf_counter() - start_time
+        results['operations']['scandir'] = {
+            'ops': entries,
+            'time': scandir_time,
+            'ops_per_s': entries / scandir_time if scandir_time else None
+        }
+        print(f"    {'scandir':<10} {entries / scandir_time:10.0f} 项/秒（共 {entries} 项）")
+
+        renamed = [path + '.renamed' for path in paths]
+        run_phase('rename', rename, zip(paths, renamed))
+        run_phase('delete', os.unlink, renamed)
+        run_phase('rmdir', os.rmdir, leaf_dirs)
+
+        return results
+
+    finally:
+        # 清理测试目录
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def _commit_modes():
+    """返回当前平台支持的持久化写入方式：名称 -> (额外的open标志, 每次写入后调用的同步函数)"""
+    modes = {'fsync': (0, os.fsync)}
+    if hasattr(os, 'fdatasync'):
+        modes['fdatasync'] = (0, os.fdatasync)
+    if hasattr(os, 'O_DSYNC'):
+        modes['o_dsync'] = (os.O_DSYNC, None)
+    return modes
+
+
+def durable_write_test(record_sizes=(512, 4096, 16384, 65536), duration=2.0, max_commits=100000, directory=None):
+    """持久化写入延迟测试（预写日志负载）
+    
+    以追加方式写入小记录，每条记录写入后立即提交：
+    write + os.fsync、write + os.fdatasync，以及使用 O_DSYNC 打开文件的同步写入。
+    每次提交（写入加同步）的延迟都记录到直方图中。
+    
+    Args:
+        record_sizes: 记录大小列表（字节）
+        duration: 每种方式和记录大小的测试时长（秒）
+        max_commits: 每种组合的最大提交次数
+        directory: 测试文件所在目录，None表示自动选择位于磁盘上的目录
+        
+    Returns:
+        dict: 按提交方式和记录大小组织的提交次数/秒、MB/s和延迟分布
+    """
+    print(f"正在进行持久化写入延迟测试 (每项时长: {duration} 秒)...")
+
+    directory = directory or default_test_directory()
+    test_file = os.path.join(directory, 'benchmark_wal_test.dat')
+    modes = _commit_modes()
+    results = {'target': find_mount(directory), 'modes': {}}
+    print(f"  文件系统: {results['target']['fstype']}（挂载点 {results['target']['mountpoint']}）")
+    for mode in ('fdatasync', 'o_dsync'):
+        if mode not in modes:
+            print(f"  当前平台不支持 {mode}，跳过")
+
+    try:
+        for mode, (extra_flags, sync_function) in modes.items():
+            print(f"  {mode}:")
+            results['modes'][mode] = []
+            for record_size in record_sizes:
+                # 每条记录内容都不同，避免去重或压缩存储跳过重复写入
+                generator = DataGenerator(record_size)
+                histogram = LatencyHistogram()
+                fd = os.open(test_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND | extra_flags, 0o644)
+                try:
+                    start_time = time.perf_counter()
+                    deadline = start_time + duration
+                    while histogram.count < max_commits and time.perf_counter() < deadline:
+                        record = generator.next_block()
+                        start_ns = time.perf_counter_ns()
+                        os.write(fd, record)
+                        if sync_function:
+                            sync_function(fd)
+                        histogram.record(time.perf_counter_ns() - start_ns)
+                    elapsed_time = time.perf_counter() - start_time
+                finally:
+                    os.close(fd)
+
+                commits_per_s = histogram.count / elapsed_time
+                results['modes'][mode].append({
+                    'record_size': record_size,
+                    'commits': histogram.count,
+                    'commits_per_s': commits_per_s,
+                    'mb_s': commits_per_s * record_size / (1024 * 1024),
+                    'latency': histogram.summary()
+                })
+                print(f"    {record_size:>6}B: {commits_per_s:9.0f} 次提交/秒  {format_summary(histogram.summary())}")
+
+        return results
+
+    finally:
+        # 清理测试文件
+        if os.path.exists(test_file):
+            os.remove(test_file)
+
+
+def _allocated_mb(path):
+    """返回文件实际分配的磁盘空间（MB），平台不提供 st_blocks 时返回None"""
+    stat_result = os.stat(path)
+    if not hasattr(stat_result, 'st_blocks'):
+        return None
+    return stat_result.st_blocks * 512 / (1024 * 1024)
+
+
+def preallocation_test(file_size_mb=256, block_size=1024 * 1024, directory=None):
+    """预分配与稀疏文件写入测试
+    
+    在同一目录中比较四种文件状态下顺序写入（含fsync）的速度：
+    新建文件追加写入、ftruncate 得到的稀疏文件、os.posix_fallocate 预分配的文件，
+    以及已完整写入过的文件原地覆盖写入。同时单独报告 posix_fallocate 本身的耗时。
+    
+    Args:
+        file_size_mb: 测试文件大小（MB）
+        block_size: 每次写入的块大小（字节）
+        directory: 测试文件所在目录，None表示自动选择位于磁盘上的目录
+        
+    Returns:
+        dict: 包含各写入方式速度、延迟分布和分配空间的字典
+    """
+    print(f"正在进行预分配与稀疏文件写入测试 (文件大小: {file_size_mb}MB)...")
+
+    directory = directory or default_test_directory()
+    test_file = os.path.join(directory, 'benchmark_prealloc_test.dat')
+    file_size = file_size_mb * 1024 * 1024
+    generator = DataGenerator(block_size)
+    target = find_mount(directory)
+    results = {'file_size_mb': file_size_mb, 'block_size': block_size, 'target': target, 'modes': {}}
+    print(f"  文件系统: {target['fstype']}（挂载点 {target['mountpoint']}）")
+
+    def prepare_fresh(fd):
+        pass
+
+    def prepare_sparse(fd):
+        os.ftruncate(fd, file_size)
+
+    def prepare_fallocate(fd):
+        start_time = time.perf_counter()
+        os.posix_fallocate(fd, 0, file_size)
+        os.fsync(fd)
+        results['fallocate_time'] = time.perf_counter() - start_time
+
+    modes = [('fresh', '新建文件', prepare_fresh), ('sparse', '稀疏文件', prepare_sparse)]
+    if hasattr(os, 'posix_fallocate'):
+        modes.append(('fallocate', 'posix_fallocate', prepare_fallocate))
+    modes.append(('overwrite', '原地覆盖', None))
+
+    try:
+        for mode, label, prepare in modes:
+            if prepare is None:
+                _create_test_file(test_file, file_size, block_size)
+                fd = os.open(test_file, os.O_WRONLY)
+            else:
+                fd = os.open(test_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                try:
+                    if prepare is not None:
+                        prepare(fd)
+                except OSError as e:
+                    print(f"    {label}: 不支持（{e}），跳过")
+                    continue
+                allocated_before = _allocated_mb(test_file)
+
+                histogram = LatencyHistogram()
+                sync_histogram = LatencyHistogram()
+                start_time = time.perf_counter()
+                for _ in range(file_size // block_size):
+                    _timed_op(histogram, os.write, fd, generator.next_block())
+                _timed_op(sync_histogram, os.fsync, fd)
+                write_time = time.perf_counter() - start_time
+            finally:
+                os.close(fd)
+
+            results['modes'][mode] = {
+                'write_time': write_time,
+                'write_speed_mb_s': file_size_mb / write_time,
+                'allocated_before_mb': allocated_before,
+                'latency': histogram.summary(),
+                'sync_latency': sync_histogram.summary()
+            }
+            allocated = f"（写入前已分配 {allocated_before:.0f}MB）" if allocated_before is not None else ""
+            print(f"    {label}: 写入 {file_size_mb / write_time:.2f} MB/s{allocated}")
+            os.remove(test_file)
+
+        if 'fallocate_time' in results:
+            print(f"    posix_fallocate 耗时: {results['fallocate_time'] * 1000:.2f} 毫秒（含fsync）")
+        else:
+            print("    当前平台不支持 posix_fallocate，跳过")
+
+        return results
+
+    finally:
+        # 清理测试文件
+        if os.path.exists(test_file):
+            os.remove(test_file)
+
+
+def _copy_userspace(source, destination, chunk_size):
+    """用户空间读写循环复制，复用同一个缓冲区"""
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(source, 'rb', buffering=0) as src, open(destination, 'wb', buffering=0) as dst:
+        while True:
+            count = src.readinto(buffer)
+            if not count:
+                break
+            dst.write(view[:count])
+
+
+def _copy_shutil(source, destination, chunk_size):
+    """shutil.copyfile（Linux上内部使用 sendfile，macOS上使用 fcopyfile）"""
+    shutil.copyfile(source, destination)
+
+
+def _copy_kernel(source, destination, copy_function):
+    """循环调用内核复制函数 copy_function(源fd, 目标fd, 字节数) 直到复制完整个文件"""
+    with open(source, 'rb') as src, open(destination, 'wb') as dst:
+        remaining = os.fstat(src.fileno()).st_size
+        while remaining > 0:
+            count = copy_function(src.fileno(), dst.fileno(), remaining)
+            if not count:
+                break
+            remaining -= count
+
+
+def _copy_sendfile(source, destination, chunk_size):
+    """os.sendfile 内核复制（Linux 2.6.33起支持文件到文件）"""
+    _copy_kernel(source, destination, lambda source_fd, destination_fd, count:
+                 os.sendfile(destination_fd, source_fd, None, count))
+
+
+def _copy_file_range(source, destination, chunk_size):
+    """os.copy_file_range 内核复制（btrfs/xfs上可能使用reflink）"""
+    _copy_kernel(source, destination, os.copy_file_range)
+
+
+def copy_path_test(file_size_mb=512, directory=None, chunk_size=1024 * 1024):
+    """文件复制路径测试
+    
+    比较用户空间读写循环、shutil.copyfile、os.sendfile 和 os.copy_file_range
+    复制大文件的速度和消耗的CPU时间（用户态和内核态）。
+    每次复制前丢弃源文件的页缓存，计时区域内包含对目标文件的fsync。
+    在btrfs/xfs等文件系统上 copy_file_range 可能通过reflink共享数据块，速度会远高于设备带宽。
+    
+    Args:
+        file_size_mb: 源文件大小（MB）
+        directory: 测试文件所在目录，None表示自动选择位于磁盘上的目录
+        chunk_size: 用户空间复制的缓冲区大小（字节）
+        
+    Returns:
+        dict: 每种复制方式的MB/s、CPU时间，不可用或失败时包含原因
+    """
+    print(f"正在进行文件复制路径测试 (文件大小: {file_size_mb}MB)...")
+
+    directory = directory or default_test_directory()
+    source = os.path.join(directory, 'benchmark_copy_source.dat')
+    destination = os.path.join(directory, 'benchmark_copy_destination.dat')
+    file_size = file_size_mb * 1024 * 1024
+    target = find_mount(directory)
+    results = {'file_size_mb': file_size_mb, 'target': target, 'methods': {}}
+    print(f"  文件系统: {target['fstype']}（挂载点 {target['mountpoint']}）")
+
+    methods = [('userspace', _copy_userspace), ('shutil_copyfile', _copy_shutil)]
+    for name, copy_function in (('sendfile', _copy_sendfile), ('copy_file_range', _copy_file_range)):
+        if hasattr(os, name):
+            methods.append((name, copy_function))
+        else:
+            results['methods'][name] = {'available': False, 'error': '当前平台不支持'}
+            print(f"  当前平台不支持 os.{name}，跳过")
+
+    try:
+        print("  创建源文件...")
+        _create_test_file(source, file_size, chunk_size)
+
+        for name, copy_function in methods:
+            _drop_file_cache(source)
+            if os.path.exists(destination):
+                os.remove(destination)
+
+            start_cpu = os.times()
+            start_time = time.perf_counter()
+            try:
+                copy_function(source, destination, chunk_size)
+                fd = os.open(destination, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            except OSError as e:
+                results['methods'][name] = {'available': False, 'error': str(e)}
+                print(f"    {name:<16} 失败: {e}")
+                continue
+            elapsed_time = time.perf_counter() - start_time
+            end_cpu = os.times()
+
+            copied = os.path.getsize(destination)
+            user_time = end_cpu.user - start_cpu.user
+            system_time = end_cpu.system - start_cpu.system
+            if copied != file_size:
+                results['methods'][name] = {'available': False, 'error': f'只复制了 {copied} 字节'}
+                print(f"    {name:<16} 失败: 只复制了 {copied} 字节")
+                continue
+
+            results['methods'][name] = {
+                'available': True,
+                'time': elapsed_time,
+                'speed_mb_s': file_size_mb / elapsed_time,
+                'user_cpu_time': user_time,
+                'system_cpu_time': system_time,
+                'cpu_seconds_per_gb': (user_time + system_time) / (file_size_mb / 1024)
+            }
+            print(f"    {name:<16} {file_size_mb / elapsed_time:9.2f} MB/s  "
+                  f"CPU 用户态 {user_time:.3f} 秒 + 内核态 {system_time:.3f} 秒")
+
+        return results
+
+    finally:
+        # 清理测试文件
+        for path in (source, destination):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _jain_fairness(values):
+    """Jain公平性指数：1.0表示各流完全均等，1/n表示只有一个流获得带宽"""
+    square_sum = sum(value * value for value in values)
+    if not square_sum:
+        return None
+    return sum(values) ** 2 / (len(values) * square_sum)
+
+
+def _wait_until(start_at):
+    """等待到统一的开始时间，使各工作者（包括其他进程中的）同时开始I/O"""
+    delay = start_at - time.time()
+    if delay > 0:
+        time.sleep(delay)
+
+
+def _stream_write_worker(path, file_size, block_size, start_at):
+    """并行流写入工作者：顺序写入自己的文件并fsync
+    
+    Returns:
+        tuple: (开始时间, 结束时间, 延迟直方图)，时间为 time.time() 以便跨进程比较
+    """
+    generator = DataGenerator(block_size)
+    histogram = LatencyHistogram()
+    _wait_until(start_at)
+    start_time = time.time()
+    with open(path, 'wb', buffering=0) as f:
+        for _ in range(file_size // block_size):
+            _timed_op(histogram, f.write, generator.next_block())
+        _timed_op(histogram, os.fsync, f.fileno())
+    return start_time, time.time(), histogram
+
+
+def _stream_read_worker(path, block_size, start_at):
+    """并行流读取工作者：顺序读取自己的文件
+    
+    Returns:
+        tuple: (开始时间, 结束时间, 延迟直方图)
+    """
+    buffer = bytearray(block_size)
+    histogram = LatencyHistogram()
+    _wait_until(start_at)
+    start_time = time.time()
+    with open(path, 'rb', buffering=0) as f:
+        while _timed_op(histogram, f.readinto, buffer):
+            pass
+    return start_time, time.time(), histogram
+
+
+def parallel_stream_test(stream_counts=(1, 2, 4, 8), file_size_mb=64, block_size=1024 * 1024,
+                         executor='thread', directory=None):
+    """并行多流顺序I/O测试
+    
+    N个工作者同时各自顺序写入（含fsync）和读取（丢弃页缓存后）自己的文件，
+    报告总吞吐量、每个流的吞吐量和Jain公平性指数。
+    NVMe和RAID通常需要多个并发流才能达到标称吞吐量。
+    
+    Args:
+        stream_counts: 要测试的并发流数列表
+        file_size_mb: 每个流的文件大小（MB）
+        block_size: 每次读写的块大小（字节）
+        executor: 'thread' 使用线程池，'process' 使用进程池
+        directory: 测试文件所在目录，None表示自动选择位于磁盘上的目录
+        
+    Returns:
+        dict: 包含各并发流数读写吞吐量和公平性的字典
+    """
+    executors = {'thread': (ThreadPoolExecutor, '线程池'), 'process': (ProcessPoolExecutor, '进程池')}
+    if executor not in executors:
+        raise ValueError(f"不支持的执行器后端: {executor}（可用: {', '.join(executors)}）")
+    executor_class, executor_label = executors[executor]
+
+    print(f"正在进行并行多流顺序I/O测试 (每流文件: {file_size_mb}MB, {executor_label})...")
+
+    file_size = file_size_mb * 1024 * 1024
+    directory = directory or default_test_directory()
+    paths = [os.path.join(directory, f'benchmark_stream_{index}.dat') for index in range(max(stream_counts))]
+    results = {'file_size_mb': file_size_mb, 'block_size': block_size, 'executor': executor,
+               'page_cache_dropped': hasattr(os, 'posix_fadvise'), 'target': find_mount(directory),
+               'write': [], 'read': []}
+    print(f"  文件系统: {results['target']['fstype']}（挂载点 {results['target']['mountpoint']}）")
+
+    def run_streams(pool, operation, stream_paths):
+        """同时启动所有流，汇总总吞吐量、每流吞吐量和公平性"""
+        start_at = time.time() + 0.2
+        if operation == 'write':
+            futures = [pool.submit(_stream_write_worker, path, file_size, block_size, start_at)
+                       for path in stream_paths]
+        else:
+            futures = [pool.submit(_stream_read_worker, path, block_size, start_at) for path in stream_paths]
+        outcomes = [future.result() for future in futures]
+
+        histogram = LatencyHistogram()
+        for _, _, stream_histogram in outcomes:
+            histogram.merge(stream_histogram)
+        stream_speeds = [file_size_mb / (end - start) for start, end, _ in outcomes]
+        elapsed_time = max(end for _, end, _ in outcomes) - min(start for start, _, _ in outcomes)
+        return {
+            'streams': len(stream_paths),
+            'aggregate_mb_s': file_size_mb * len(stream_paths) / elapsed_time,
+            'stream_mb_s': stream_speeds,
+            'fairness': _jain_fairness(stream_speeds),
+            'latency': histogram.summary()
         }
 
+    try:
+        with executor_class(max_workers=max(stream_counts)) as pool:
+            for stream_count in stream_counts:
+                stream_paths = paths[:stream_count]
+                write_result = run_streams(pool, 'write', stream_paths)
+                for path in stream_paths:
+                    _drop_file_cache(path)
+                read_result = run_streams(pool, 'read', stream_paths)
+                results['write'].append(write_result)
+                results['read'].append(read_result)
+
+                print(f"    {stream_count:>3} 流: 写入 {write_result['aggregate_mb_s']:9.2f} MB/s"
+                      f"（每流 {min(write_result['stream_mb_s']):.1f}-{max(write_result['stream_mb_s']):.1f}，"
+                      f"公平性 {write_result['fairness']:.3f}）  "
+                      f"读取 {read_result['aggregate_mb_s']:9.2f} MB/s"
+                      f"（每流 {min(read_result['stream_mb_s']):.1f}-{max(read_result['stream_mb_s']):.1f}，"
+                      f"公平性 {read_result['fairness']:.3f}）")
+
+        return results
+
+    finally:
+        # 清理测试文件
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _create_test_file(path, size, chunk_size=1024 * 1024):
+    """写入指定大小的随机数据文件并同步到磁盘"""
+    generator = DataGenerator(chunk_size)
+    with open(path, 'wb') as f:
+        remaining = size
+        while remaining > 0:
+            f.write(generator.next_block()[:min(chunk_size, remaining)])
+            remaining -= chunk_size
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _random_io_worker(fd, operation, block_size, block_count, deadline, seed):
+    """随机I/O工作线程：在截止时间前不断执行按块对齐的 preadv/pwritev
+    
+    Returns:
+        LatencyHistogram: 本线程每次I/O的延迟直方图（count即完成的操作数）
+    """
+    rng = random.Random(seed)
+    # 页对齐的缓冲区同时满足 O_DIRECT 的要求
+    buffer = mmap.mmap(-1, block_size)
+    generator = DataGenerator(block_size, buffer=buffer)
+    io_function = os.preadv if operation == 'read' else os.pwritev
+    histogram = LatencyHistogram()
+    try:
+        while time.perf_counter() < deadline:
+            offset = rng.randrange(block_count) * block_size
+            if operation == 'write':
+                # 每次写入的块内容都不同
+                generator.next_block()
+            _timed_op(histogram, io_function, fd, [buffer], offset)
+    finally:
+        generator.close()
+        buffer.close()
+    return histogram
+
+
+def _open_for_random_io(path, direct, extra_flags=0):
+    """打开随机I/O测试文件，direct为True时优先使用 O_DIRECT，extra_flags为额外的打开标志（如 O_DSYNC）
+    
+    Returns:
+        tuple: (文件描述符, 是否使用了 O_DIRECT)
+    """
+    flags = os.O_RDWR | getattr(os, 'O_BINARY', 0) | extra_flags
+    if direct and hasattr(os, 'O_DIRECT'):
+        try:
+            return os.open(path, flags | os.O_DIRECT), True
+        except OSError:
+            pass
+    return os.open(path, flags), False
+
+
+def random_iops_test(file_size_mb=256, block_size=4096, queue_depths=(1, 2, 4, 8, 16, 32, 64),
+                     duration=2.0, directory=None, direct=True):
+    """随机读写IOPS测试
+    
+    在预先写好的文件上以 block_size 对齐的随机偏移执行 os.preadv/os.pwritev。
+    队列深度由同时发起同步I/O的线程数模拟（preadv/pwritev 执行期间会释放GIL）。
+    direct为True、block_size是 DIRECT_IO_ALIGNMENT 的整数倍且文件系统支持时使用 O_DIRECT 绕过页缓存，
+    否则读取前丢弃文件的页缓存。
+    
+    Args:
+        file_size_mb: 测试文件大小（MB）
+        block_size: 每次I/O的大小（字节）
+        queue_depths: 要测试的队列深度列表
+        duration: 每个队列深度的测试时长（秒）
+        directory: 测试文件所在目录，None表示自动选择位于磁盘上的目录
+        direct: 是否尝试使用 O_DIRECT
+        
+    Returns:
+        dict: 包含各队列深度读写IOPS、MB/s和延迟分布的字典；平台不支持 preadv/pwritev 时返回None
+    """
+    print(f"正在进行随机I/O IOPS测试 (块大小: {block_size}B, 文件大小: {file_size_mb}MB)...")
+
+    if not (hasattr(os, 'preadv') and hasattr(os, 'pwritev')):
+        print("  当前平台不支持 os.preadv/os.pwritev，跳过随机I/O测试")
+        return None
+
+    if direct and block_size % DIRECT_IO_ALIGNMENT:
+        print(f"  块大小不是 {DIRECT_IO_ALIGNMENT}B 的整数倍，无法使用 O_DIRECT，改用页缓存")
+        direct = False
+
+    directory = directory or default_test_directory()
+    test_file = os.path.join(directory, 'benchmark_iops_test.dat')
+    file_size = file_size_mb * 1024 * 1024
+    block_count = file_size // block_size
+    results = {'file_size_mb': file_size_mb, 'block_size': block_size, 'duration': duration,
+               'target': find_mount(directory)}
+    print(f"  文件系统: {results['target']['fstype']}（挂载点 {results['target']['mountpoint']}）")
+
+    try:
+        print("  预分配测试文件...")
+        _create_test_file(test_file, file_size)
+
+        fd, results['direct'] = _open_for_random_io(test_file, direct)
+        print(f"  缓存模式: {'O_DIRECT' if results['direct'] else '页缓存'}")
+        try:
+            for operation in ('read', 'write'):
+                if not results['direct']:
+                    _drop_file_cache(test_file)
+                print(f"  测试随机{'读取' if operation == 'read' else '写入'}...")
+                results[operation] = []
+                for queue_depth in queue_depths:
+                    start_time = time.perf_counter()
+                    deadline = start_time + duration
+                    with ThreadPoolExecutor(max_workers=queue_depth) as executor:
+                        futures = [
+                            executor.submit(_random_io_worker, fd, operation, block_size, block_count, deadline, i)
+                            for i in range(queue_depth)
+                        ]
+                        histogram = LatencyHistogram()
+                        for future in futures:
+                            histogram.merge(future.result())
+                    elapsed_time = time.perf_counter() - start_time
+
+                    iops = histogram.count / elapsed_time
+                    results[operation].append({
+                        'queue_depth': queue_depth,
+                        'ops': histogram.count,
+                        'iops': iops,
+                        'mb_s': iops * block_size / (1024 * 1024),
+                        'latency': histogram.summary()
+                    })
+                    print(f"    QD{queue_depth:<3} {iops:10.0f} IOPS  {iops * block_size / (1024 * 1024):8.2f} MB/s  "
+                          f"{format_summary(histogram.summary())}")
+        finally:
+            os.close(fd)
+
+        return results
+
     finally:
         # 清理测试文件
         if os.path.exists(test_file):
             os.remove(test_file)
 
 
+# fio风格作业的默认参数，作业文件中未指定的字段使用这些值
+JOB_DEFAULTS = {
+    'name': 'job',
+    'read_percent': 100,      # 读操作所占百分比，70表示70%读/30%写
+    'pattern': 'random',      # sequential、random 或 zipfian
+    'block_size': 4096,
+    'queue_depth': 1,         # 每个工作者内同时发起I/O的线程数
+    'file_size': 256 * 1024 * 1024,
+    'num_jobs': 1,            # 工作者数，每个工作者使用自己的文件
+    'runtime': 5.0,           # 秒
+    'sync': 'none',           # none、fsync、fdatasync 或 o_dsync
+    'sync_interval': 1,       # fsync/fdatasync 时每多少次写入同步一次
+    'direct': False,          # 是否尝试使用 O_DIRECT
+    'zipf_theta': 1.2,        # zipfian 分布的偏斜度
+    'executor': 'thread',     # thread 或 process
+}
+JOB_PATTERNS = ('sequential', 'random', 'zipfian')
+JOB_SYNC_POLICIES = ('none', 'fsync', 'fdatasync', 'o_dsync')
+JOB_EXECUTORS = {'thread': ThreadPoolExecutor, 'process': ProcessPoolExecutor}
+SIZE_UNITS = {'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3}
+# O_DIRECT 要求偏移和长度按设备逻辑块对齐，4KB满足常见的512B和4KB逻辑块
+DIRECT_IO_ALIGNMENT = 4096
+
+# 未指定作业文件时运行的示例作业
+DEFAULT_JOBS = [
+    {'name': 'oltp_70_30', 'read_percent': 70, 'pattern': 'random', 'block_size': '8k',
+     'queue_depth': 8, 'direct': True},
+    {'name': 'wal_append', 'read_percent': 0, 'pattern': 'sequential', 'block_size': '16k',
+     'sync': 'fdatasync'},
+    {'name': 'hot_read', 'read_percent': 100, 'pattern': 'zipfian', 'block_size': '4k',
+     'queue_depth': 4, 'direct': True},
+]
+
+
+def _parse_size(value):
+    """解析大小：整数字节数，或带 k/m/g 后缀的字符串（如 '4k'、'256m'）"""
+    if isinstance(value, int):
+        return value
+    text = str(value).strip().lower().rstrip('b')
+    if text and text[-1] in SIZE_UNITS:
+        return int(float(text[:-1]) * SIZE_UNITS[text[-1]])
+    return int(text)
+
+
+def normalize_job(job, defaults=None):
+    """合并默认参数并校验作业定义
+    
+    Args:
+        job: 作业字典
+        defaults: 作业文件中的全局参数，覆盖 JOB_DEFAULTS
+        
+    Returns:
+        dict: 完整的作业定义，大小字段已转换为字节数
+    """
+    unknown = set(job) - set(JOB_DEFAULTS)
+    if unknown:
+        raise ValueError(f"未知的作业参数: {', '.join(sorted(unknown))}")
+    merged = {**JOB_DEFAULTS, **(defaults or {}), **job}
+    for key in ('block_size', 'file_size'):
+        merged[key] = _parse_size(merged[key])
+    for key in ('queue_depth', 'num_jobs', 'sync_interval'):
+        merged[key] = int(merged[key])
+    merged['runtime'] = float(merged['runtime'])
+    merged['read_percent'] = float(merged['read_percent'])
+
+    if merged['pattern'] not in JOB_PATTERNS:
+        raise ValueError(f"不支持的访问模式: {merged['pattern']}（可用: {', '.join(JOB_PATTERNS)}）")
+    if merged['sync'] not in JOB_SYNC_POLICIES:
+        raise ValueError(f"不支持的同步策略: {merged['sync']}（可用: {', '.join(JOB_SYNC_POLICIES)}）")
+    if merged['executor'] not in JOB_EXECUTORS:
+        raise ValueError(f"不支持的执行器后端: {merged['executor']}（可用: {', '.join(JOB_EXECUTORS)}）")
+    if not 0 <= merged['read_percent'] <= 100:
+        raise ValueError("read_percent 必须在 0 到 100 之间")
+    if merged['block_size'] <= 0 or merged['file_size'] < merged['block_size']:
+        raise ValueError("block_size 必须为正数且不大于 file_size")
+    if min(merged['queue_depth'], merged['num_jobs'], merged['sync_interval']) < 1:
+        raise ValueError("queue_depth、num_jobs 和 sync_interval 必须至少为1")
+    if merged['direct'] and (merged['block_size'] % DIRECT_IO_ALIGNMENT or merged['file_size'] % merged['block_size']):
+        raise ValueError(f"direct 作业的 block_size 必须是 {DIRECT_IO_ALIGNMENT} 的整数倍，"
+                         f"file_size 必须是 block_size 的整数倍")
+    return merged
+
+
+def load_job_file(path):
+    """读取JSON作业文件
+    
+    格式为 {"global": {...}, "jobs": [{...}, ...]}，global 中的参数作为每个作业的默认值；
+    也可以直接是作业列表。
+    
+    Returns:
+        list: 完整的作业定义列表
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        content = json.load(f)
+    if isinstance(content, list):
+        content = {'jobs': content}
+    defaults = content.get('global', {})
+    normalize_job(defaults)
+    return [normalize_job(job, defaults) for job in content['jobs']]
+
+
+def _zipf_samples(block_count, theta, count, seed):
+    """按zipf分布预先生成块序号，热点块随机分布在文件中
+    
+    Returns:
+        numpy.ndarray: 长度为 count 的块序号数组
+    """
+    rng = np.random.default_rng(seed)
+    blocks = rng.permutation(block_count)
+    cumulative = np.cumsum(1.0 / np.arange(1, block_count + 1, dtype=np.float64) ** theta)
+    ranks = np.searchsorted(cumulative, rng.random(count) * cumulative[-1], side='right')
+    return blocks[np.minimum(ranks, block_count - 1)]
+
+
+def _job_worker(job, path, seed, start_at):
+    """作业工作者：在自己的文件上用 queue_depth 个线程执行读写混合
+    
+    Returns:
+        dict: 读、写、同步操作的延迟直方图，开始/结束时间（time.time()）和是否使用了 O_DIRECT
+    """
+    extra_flags = os.O_DSYNC if job['sync'] == 'o_dsync' and hasattr(os, 'O_DSYNC') else 0
+    fd, used_direct = _open_for_random_io(path, job['direct'], extra_flags)
+    block_size = job['block_size']
+    block_count = job['file_size'] // block_size
+    sync_function = {'fsync': os.fsync, 'fdatasync': getattr(os, 'fdatasync', os.fsync)}.get(job['sync'])
+    sequential_counter = itertools.count()
+    zipf_blocks = None
+    if job['pattern'] == 'zipfian':
+        zipf_blocks = _zipf_samples(block_count, job['zipf_theta'], 1 << 16, seed)
+
+    def io_thread(thread_index, deadline):
+        rng = random.Random(seed * 1000 + thread_index)
+        # 页对齐的缓冲区同时满足 O_DIRECT 的要求
+        buffer = mmap.mmap(-1, block_size)
+        generator = DataGenerator(block_size, buffer=buffer)
+        histograms = {'read': LatencyHistogram(), 'write': LatencyHistogram(), 'sync': LatencyHistogram()}
+        zipf_position = rng.randrange(len(zipf_blocks)) if zipf_blocks is not None else 0
+        writes = 0
+        try:
+            while time.perf_counter() < deadline:
+                if job['pattern'] == 'sequential':
+                    block = next(sequential_counter) % block_count
+                elif zipf_blocks is not None:
+                    block = int(zipf_blocks[zipf_position % len(zipf_blocks)])
+                    zipf_position += 1
+                else:
+                    block = rng.randrange(block_count)
+
+                if rng.random() * 100 < job['read_percent']:
+                    _timed_op(histograms['read'], os.preadv, fd, [buffer], block * block_size)
+                else:
+                    generator.next_block()
+                    _timed_op(histograms['write'], os.pwritev, fd, [buffer], block * block_size)
+                    writes += 1
+                    if sync_function and writes % job['sync_interval'] == 0:
+                        _timed_op(histograms['sync'], sync_function, fd)
+        finally:
+            generator.close()
+            buffer.close()
+        return histograms
+
+    try:
+        _wait_until(start_at)
+        start_time = time.time()
+        deadline = time.perf_counter() + job['runtime']
+        with ThreadPoolExecutor(max_workers=job['queue_depth']) as executor:
+            futures = [executor.submit(io_thread, i, deadline) for i in range(job['queue_depth'])]
+            merged = {'read': LatencyHistogram(), 'write': LatencyHistogram(), 'sync': LatencyHistogram()}
+            for future in futures:
+                for kind, histogram in future.result().items():
+                    merged[kind].merge(histogram)
+        end_time = time.time()
+    finally:
+        os.close(fd)
+    return {**merged, 'start': start_time, 'end': end_time, 'direct': used_direct}
+
+
+def run_disk_jobs(jobs=None, job_file=None, directory=None):
+    """fio风格的声明式磁盘作业引擎
+    
+    每个作业指定读写比例、访问模式（sequential/random/zipfian）、块大小、队列深度、
+    文件大小、工作者数、运行时长和同步策略（字段及默认值见 JOB_DEFAULTS），
+    由线程池或进程池中的工作者执行。I/O使用 os.preadv/os.pwritev，
+    每个工作者使用自己的预先写好的文件，队列深度由工作者内同时发起I/O的线程数模拟。
+    
+    Args:
+        jobs: 作业字典列表，None表示读取 job_file，二者都未指定时运行 DEFAULT_JOBS
+        job_file: JSON作业文件路径（格式见 load_job_file）
+        directory: 测试文件所在目录，None表示自动选择位于磁盘上的目录
+        
+    Returns:
+        dict: 每个作业的IOPS、MB/s和读/写/同步延迟分布；平台不支持 preadv/pwritev 时返回None
+    """
+    if jobs is None:
+        jobs = load_job_file(job_file) if job_file else [normalize_job(job) for job in DEFAULT_JOBS]
+    else:
+        jobs = [normalize_job(job) for job in jobs]
+    print(f"正在运行磁盘作业 (作业数: {len(jobs)})...")
+
+    if not (hasattr(os, 'preadv') and hasattr(os, 'pwritev')):
+        print("  当前平台不支持 os.preadv/os.pwritev，跳过磁盘作业")
+        return None
+
+    directory = directory or default_test_directory()
+    results = {'target': find_mount(directory), 'jobs': []}
+
+    for index, job in enumerate(jobs):
+        print(f"  作业 {job['name']}: 读 {job['read_percent']:.0f}% / 写 {100 - job['read_percent']:.0f}%，"
+              f"{job['pattern']}，块 {job['block_size']}B，QD{job['queue_depth']} × {job['num_jobs']} 个工作者，"
+              f"同步 {job['sync']}")
+        paths = [os.path.join(directory, f'benchmark_job_{index}_{worker}.dat') for worker in range(job['num_jobs'])]
+        try:
+            for path in paths:
+                _create_test_file(path, job['file_size'])
+                _drop_file_cache(path)
+
+            start_at = time.time() + 0.2
+            with JOB_EXECUTORS[job['executor']](max_workers=job['num_jobs']) as executor:
+                futures = [executor.submit(_job_worker, job, path, index * 100 + worker, start_at)
+                           for worker, path in enumerate(paths)]
+                outcomes = [future.result() for future in futures]
+        finally:
+            for path in paths:
+                if os.path.exists(path):
+                    os.remove(path)
+
+        elapsed_time = max(outcome['end'] for outcome in outcomes) - min(outcome['start'] for outcome in outcomes)
+        job_result = {'job': job, 'elapsed_time': elapsed_time, 'direct': all(outcome['direct'] for outcome in outcomes)}
+        for kind in ('read', 'write', 'sync'):
+            histogram = LatencyHistogram()
+            for outcome in outcomes:
+                histogram.merge(outcome[kind])
+            iops = histogram.count / elapsed_time
+            job_result[kind] = {'ops': histogram.count, 'iops': iops, 'latency': histogram.summary()}
+            if kind != 'sync':
+                job_result[kind]['mb_s'] = iops * job['block_size'] / (1024 * 1024)
+            if histogram.count:
+                throughput = f"  {job_result[kind]['mb_s']:8.2f} MB/s" if kind != 'sync' else ""
+                print(f"    {kind:<5} {iops:10.0f} IOPS{throughput}  {format_summary(histogram.summary())}")
+        results['jobs'].append(job_result)
+
+    return results
+
+
 if __name__ == "__main__":
     # 测试代码
     print("磁盘I/O性能测试示例")
@@ -316,6 +316,12 @@ TRANSLATIONS = {
         'ja': '利用可能なメモリ',
         'es': 'Memoria Disponible'
     },
+    'numa_nodes': {
+        'zh': 'NUMA节点数',
+        'en': 'NUMA Nodes',
+        'ja': 'NUMAノード数',
+        'es': 'Nodos NUMA'
+    },
     'gpu_info': {
         'zh': 'GPU信息',
         'en': 'GPU Information',
@@ -656,6 +662,30 @@ TRANSLATIONS = {
         'ja': '静かモード、最終結果のみを表示',
         'es': 'Modo silencioso, mostrar solo resultados finales'
     },
+    'cli_extended_help': {
+        'zh': '运行指定的扩展测试（不计入综合得分）',
+        'en': 'Run the given extended tests (not included in the total score)',
+        'ja': '指定した拡張テストを実行（総合スコアには含まれません）',
+        'es': 'Ejecutar las pruebas extendidas indicadas (no incluidas en la puntuación total)'
+    },
+    'cli_disk_target_help': {
+        'zh': '磁盘测试的目录或挂载点（可指定多个，分别报告）',
+        'en': 'Directories or mount points for the disk test (several may be given, reported separately)',
+        'ja': 'ディスクテストのディレクトリまたはマウントポイント（複数指定可、個別に報告）',
+        'es': 'Directorios o puntos de montaje para la prueba de disco (se pueden indicar varios, con resultados por separado)'
+    },
+    'cli_allow_non_disk_help': {
+        'zh': '允许将 tmpfs/overlay 目标的结果计入磁盘得分',
+        'en': 'Allow tmpfs/overlay targets to be scored as disk',
+        'ja': 'tmpfs/overlay ターゲットの結果をディスクスコアに含めることを許可',
+        'es': 'Permitir que los destinos tmpfs/overlay se puntúen como disco'
+    },
+    'cli_job_file_help': {
+        'zh': '运行JSON作业文件中定义的fio风格磁盘作业（扩展测试 disk_jobs）',
+        'en': 'Run fio-style disk jobs defined in a JSON job file (extended test disk_jobs)',
+        'ja': 'JSONジョブファイルで定義したfio形式のディスクジョブを実行（拡張テスト disk_jobs）',
+        'es': 'Ejecutar trabajos de disco estilo fio definidos en un archivo JSON (prueba extendida disk_jobs)'
+    },
     'cli_language_help': {
         'zh': '设置语言 (zh: 中文, en: 英文, ja: 日文, es: 西班牙语)',
         'en': 'Set language (zh: Chinese, en: English, ja: Japanese, es: Spanish)',
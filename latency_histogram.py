@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+延迟直方图模块
+HDR风格的对数-线性分桶直方图，内存占用固定，用于记录逐次I/O延迟
+"""
+
+import math
+from array import array
+
+# 每个2的幂区间内的线性子桶数为 2^(SUB_BUCKET_BITS-1)，相对误差约为 1/32
+SUB_BUCKET_BITS = 6
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+HALF_SUB_BUCKET_COUNT = SUB_BUCKET_COUNT // 2
+# 最大可区分的右移位数，2^(40+6) 纳秒约为19小时
+MAX_SHIFT = 40
+BUCKET_COUNT = SUB_BUCKET_COUNT + MAX_SHIFT * HALF_SUB_BUCKET_COUNT
+
+# 报告中输出的百分位
+REPORT_PERCENTILES = (('p50', 50.0), ('p90', 90.0), ('p99', 99.0), ('p999', 99.9))
+
+
+def _bucket_index(value):
+    """返回数值所在桶的索引"""
+    if value < SUB_BUCKET_COUNT:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    if shift > MAX_SHIFT:
+        return BUCKET_COUNT - 1
+    return SUB_BUCKET_COUNT + (shift - 1) * HALF_SUB_BUCKET_COUNT + (value >> shift) - HALF_SUB_BUCKET_COUNT
+
+
+def _bucket_upper_bound(index):
+    """返回桶内可表示的最大数值"""
+    if index < SUB_BUCKET_COUNT:
+        return index
+    shift = (index - SUB_BUCKET_COUNT) // HALF_SUB_BUCKET_COUNT + 1
+    mantissa = (index - SUB_BUCKET_COUNT) % HALF_SUB_BUCKET_COUNT + HALF_SUB_BUCKET_COUNT
+    return ((mantissa + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """固定内存的延迟直方图（单位：纳秒）
+
+    无论记录多少次，内存占用都只有 BUCKET_COUNT 个64位计数器。
+    非线程安全：每个线程使用自己的直方图，结束后用 merge 合并。
+    """
+
+    def __init__(self):
+        self.counts = array('Q', bytes(8 * BUCKET_COUNT))
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def record(self, value_ns):
+        """记录一次延迟（纳秒）"""
+        value_ns = max(0, int(value_ns))
+        self.counts[_bucket_index(value_ns)] += 1
+        self.count += 1
+        self.total += value_ns
+        if self.min is None or value_ns < self.min:
+            self.min = value_ns
+        if self.max is None or value_ns > self.max:
+            self.max = value_ns
+
+    def merge(self, other):
+        """合并另一个直方图的记录"""
+        for index, bucket_count in enumerate(other.counts):
+            if bucket_count:
+                self.counts[index] += bucket_count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def percentile(self, percent):
+        """返回指定百分位的延迟（纳秒），没有记录时返回None"""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(percent / 100 * self.count))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(_bucket_upper_bound(index), self.max)
+        return self.max
+
+    def summary(self):
+        """返回报告用的统计字典（单位：微秒）"""
+        if not self.count:
+            return {'count': 0}
+        result = {
+            'count': self.count,
+            'min_us': self.min / 1000,
+            'mean_us': self.total / self.count / 1000,
+        }
+        for name, percent in REPORT_PERCENTILES:
+            result[f'{name}_us'] = self.percentile(percent) / 1000
+        result['max_us'] = self.max / 1000
+        return result
+
+
+def format_summary(summary):
+    """将 summary() 的结果格式化为单行文本"""
+    if not summary.get('count'):
+        return "无记录"
+    return (f"p50 {summary['p50_us']:.1f}us  p90 {summary['p90_us']:.1f}us  "
+            f"p99 {summary['p99_us']:.1f}us  p99.9 {summary['p999_us']:.1f}us  max {summary['max_us']:.1f}us")
@@ -2,41 +2,287 @@
 # -*- coding: utf-8 -*-
 """
 内存性能测试模块
-测试内存分配和访问速度
+测试内存分配速度和内存带宽
 """
 
+import io
+import os
+import gc
+import sys
+import shutil
+import glob
+import math
+import mmap
 import time
+import queue
+import functools
+import statistics
+import tracemalloc
+import multiprocessing
+from multiprocessing import shared_memory
 
+import numpy as np
+import psutil
 
-def memory_test(size_mb=200):
+# resource模块仅在类Unix系统上可用，Windows上改用psutil统计缺页次数
+try:
+    import resource
+    HAS_RESOURCE = True
+except ImportError:
+    HAS_RESOURCE = False
+
+
+# 内存预算相对有效可用内存保留的安全余量
+MEMORY_SAFETY_MARGIN = 0.25
+
+# 等待工作进程结果的最长时间（秒）
+WORKER_TIMEOUT = 300
+
+# 内存老化测试中每次生成的随机图案元素数
+MEMTEST_RANDOM_CHUNK = 64 * 1024
+
+# STREAM各内核按约定计入带宽的数组个数
+STREAM_KERNEL_ARRAYS = {'copy': 2, 'scale': 2, 'add': 3, 'triad': 3}
+
+# STREAM Triad的分块大小（元素数）：256KB的中间结果块可以留在L2缓存中
+TRIAD_BLOCK_ELEMENTS = 32 * 1024
+
+
+def _cgroup_inactive_file(stat_path, key):
+    """读取cgroup memory.stat 中的非活跃文件页缓存（字节），无法读取时返回0"""
+    try:
+        with open(stat_path) as f:
+            for line in f:
+                name, _, value = line.partition(' ')
+                if name == key:
+                    return int(value)
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def _cgroup_memory_remaining():
+    """读取cgroup（v2或v1）内存限制下的剩余可用量（字节），未设置限制时返回None
+    
+    使用量扣除可回收的非活跃文件页缓存（inactive_file），与内核回收前可用的工作集一致，
+    避免磁盘测试留下的页缓存使内存预算被低估。
+    """
+    candidates = [
+        ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory.current',
+         '/sys/fs/cgroup/memory.stat', 'inactive_file'),
+        ('/sys/fs/cgroup/memory/memory.limit_in_bytes', '/sys/fs/cgroup/memory/memory.usage_in_bytes',
+         '/sys/fs/cgroup/memory/memory.stat', 'total_inactive_file'),
+    ]
+    for limit_path, usage_path, stat_path, inactive_key in candidates:
+        try:
+            with open(limit_path) as f:
+                limit_text = f.read().strip()
+            if limit_text == 'max':
+                return None
+            limit = int(limit_text)
+            # cgroup v1 未设置限制时为一个接近2^63的值
+            if limit >= 1 << 60:
+                return None
+            with open(usage_path) as f:
+                usage = int(f.read().strip())
+        except (OSError, ValueError):
+            continue
+        working_set = max(0, usage - _cgroup_inactive_file(stat_path, inactive_key))
+        return max(0, limit - working_set)
+    return None
+
+
+def effective_available_memory():
+    """返回有效可用内存（字节）：系统可用内存与cgroup剩余额度中的较小值"""
+    available = psutil.virtual_memory().available
+    remaining = _cgroup_memory_remaining()
+    return min(available, remaining) if remaining is not None else available
+
+
+def _memory_budget(divisor=1):
+    """扣除安全余量后的内存预算（字节），按 divisor 等分"""
+    return int(effective_available_memory() * (1 - MEMORY_SAFETY_MARGIN)) // divisor
+
+
+def _cap_shared_region(region_bytes, count):
+    """将共享内存区域大小限制在 /dev/shm 剩余空间内（扣除安全余量后由 count 个区域等分）
+    
+    Docker默认的 /dev/shm 只有64MB，超出后访问共享内存的进程会因SIGBUS退出。
+    没有 /dev/shm 的平台（Windows、macOS）直接返回原大小。
+    """
+    if not os.path.isdir('/dev/shm'):
+        return region_bytes
+    try:
+        free = shutil.disk_usage('/dev/shm').free
+    except OSError:
+        return region_bytes
+    limit = max(1024 * 1024, int(free * (1 - MEMORY_SAFETY_MARGIN)) // count)
+    if region_bytes > limit:
+        print(f"  /dev/shm 剩余 {free / (1024 * 1024):.0f}MB，区域大小限制为 {limit / (1024 * 1024):.0f}MB")
+        return limit
+    return region_bytes
+
+
+def _reset_peak_rss():
+    """重置Linux的VmHWM峰值统计，成功时返回True"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _read_peak_rss():
+    """读取Linux的VmHWM峰值常驻内存（字节），无法获取时返回None"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _lifetime_peak_rss(process):
+    """读取进程生命周期内的峰值常驻内存（字节），无法获取时返回None
+    
+    Windows使用峰值工作集（peak_wset），其他平台使用 getrusage 的 ru_maxrss；两者都无法重置。
+    """
+    peak_wset = getattr(process.memory_info(), 'peak_wset', None)
+    if peak_wset is not None:
+        return peak_wset
+    if HAS_RESOURCE:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS上单位为字节，其他系统为KB
+        return max_rss if sys.platform == 'darwin' else max_rss * 1024
+    return None
+
+
+class MemoryPhaseTracker:
+    """记录一个测试阶段的峰值常驻内存和tracemalloc峰值
+    
+    Linux上通过重置并读取VmHWM得到阶段内的精确峰值。其他平台读取无法重置的进程峰值
+    （Windows的peak_wset或ru_maxrss）：阶段内创下新峰值时它就是阶段峰值，
+    否则报告进程峰值并将 peak_rss_scope 标为 'process'，不会低估阶段内的峰值。
+    trace_python为True时在阶段内开启tracemalloc，它会给每次Python内存分配增加开销，
+    因此不应包裹对分配速度敏感的计时区域。
+    """
+
+    def __init__(self, trace_python=True):
+        self.trace_python = trace_python
+        self.peak_rss = None
+        self.peak_rss_scope = None
+        self.tracemalloc_peak = None
+        self._process = psutil.Process()
+        self._hwm_reset = False
+        self._started_tracemalloc = False
+
+    def __enter__(self):
+        self._hwm_reset = _reset_peak_rss()
+        self._lifetime_peak_start = None if self._hwm_reset else _lifetime_peak_rss(self._process)
+        if self.trace_python:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            tracemalloc.reset_peak()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        hwm = _read_peak_rss() if self._hwm_reset else None
+        if hwm is not None:
+            self.peak_rss, self.peak_rss_scope = hwm, 'phase'
+        else:
+            self.peak_rss = _lifetime_peak_rss(self._process)
+            if self.peak_rss is not None:
+                raised = self._lifetime_peak_start is not None and self.peak_rss > self._lifetime_peak_start
+                self.peak_rss_scope = 'phase' if raised else 'process'
+        if self.trace_python:
+            self.tracemalloc_peak = tracemalloc.get_traced_memory()[1]
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+        return False
+
+    def report(self):
+        """返回阶段内存统计字典（MB）"""
+        return {
+            'peak_rss_mb': self.peak_rss / (1024 * 1024) if self.peak_rss is not None else None,
+            'peak_rss_scope': self.peak_rss_scope,
+            'tracemalloc_peak_mb': self.tracemalloc_peak / (1024 * 1024) if self.tracemalloc_peak is not None else None
+        }
+
+
+def _print_phase_memory(report, indent="  "):
+    """打印阶段内存统计（MemoryPhaseTracker.report() 的结果）"""
+    if report['peak_rss_mb'] is None:
+        return
+    label = "进程峰值常驻内存" if report.get('peak_rss_scope') == 'process' else "峰值常驻内存"
+    line = f"{indent}{label}: {report['peak_rss_mb']:.2f} MB"
+    if report['tracemalloc_peak_mb'] is not None:
+        line += f"，tracemalloc峰值: {report['tracemalloc_peak_mb']:.2f} MB"
+    print(line)
+
+
+def _track_workload_memory(trace_python=True):
+    """装饰内存测试函数，记录整个测试期间的峰值常驻内存和tracemalloc峰值
+    
+    返回值为字典时加入 peak_rss_mb、peak_rss_scope 和 tracemalloc_peak_mb。多进程测试只统计主进程；
+    计时对Python对象分配敏感的测试（指针追逐的解释器循环、对象分配）应使用 trace_python=False。
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with MemoryPhaseTracker(trace_python) as tracker:
+                result = function(*args, **kwargs)
+            if isinstance(result, dict):
+                result.update(tracker.report())
+                _print_phase_memory(result)
+            return result
+        return wrapper
+    return decorator
+
+
+def memory_test(size_mb=None):
     """内存性能测试（优化为低配置硬件）
     
-    测试不同大小内存块的分配速度
+    测试不同大小内存块的分配速度。测试总量不超过内存预算（有效可用内存扣除安全余量），
+    每个阶段记录峰值常驻内存，tracemalloc峰值在单独的未计时运行中取得。
     
     Args:
-        size_mb: 最大测试内存大小（MB）
+        size_mb: 最大测试内存大小（MB），None表示取1GB与内存预算1/2中的较小值
         
     Returns:
         dict: 包含测试结果的字典
     """
     print("正在进行内存性能测试...")
 
-    # 降低测试内存大小以适配低配置硬件
-    max_size = size_mb * 1024 * 1024  # 转换为字节
+    budget = _memory_budget(2)
+    if size_mb is None:
+        max_size = min(1024 ** 3, budget)
+    else:
+        max_size = min(size_mb * 1024 * 1024, budget)  # 转换为字节
     sizes = [1024, 1024 * 1024, min(5 * 1024 * 1024, max_size // 4), min(max_size, 20 * 1024 * 1024)]  # 1KB, 1MB, 5MB, 20MB（最大）
     results = {}
 
     for size in sizes:
         print(f"  测试 {size // 1024}KB 内存分配...")
 
-        start_time = time.time()
-        data_list = []
-        # 降低测试次数以减少内存压力
-        test_count = min(50, max_size // size)  # 从200降低到50，并根据内存大小调整
-        for _ in range(test_count):
-            data = bytearray(size)
-            data_list.append(data)
-        end_time = time.time()
+        # 同时保留的块数由测试总量决定
+        test_count = max(1, max_size // size)
+        with MemoryPhaseTracker(trace_python=False) as tracker:
+            start_time = time.time()
+            data_list = []
+            for _ in range(test_count):
+                data = bytearray(size)
+                data_list.append(data)
+            end_time = time.time()
+            # 清理内存
+            del data_list
+
+        with MemoryPhaseTracker() as trace_tracker:
+            data_list = [bytearray(size) for _ in range(test_count)]
+            del data_list
 
         allocation_time = end_time - start_time
         # 添加检查，防止除零错误
@@ -45,20 +291,1145 @@ def memory_test(size_mb=200):
         else:
             throughput = float('inf')  # 如果时间太短，设置为无穷大
 
-        # 清理内存
-        del data_list
-
+        phase_memory = tracker.report()
+        phase_memory['tracemalloc_peak_mb'] = trace_tracker.report()['tracemalloc_peak_mb']
         results[f'{size // 1024}KB'] = {
             'allocation_time': allocation_time,
-            'throughput_mb_s': throughput
+            'throughput_mb_s': throughput,
+            'block_count': test_count,
+            **phase_memory
         }
 
         print(f"    分配时间: {allocation_time:.4f} 秒")
         print(f"    吞吐量: {throughput:.2f} MB/s")
+        _print_phase_memory(phase_memory, indent="    ")
+
+    return results
+
+
+def _cpu_cache_sizes():
+    """读取CPU各级数据缓存大小（字节），仅支持Linux sysfs
+    
+    Returns:
+        dict: 形如 {'L1': 49152, 'L2': 2097152, 'L3': 110100480} 的字典，无法获取时为空
+    """
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    sizes = {}
+    for index_dir in glob.glob('/sys/devices/system/cpu/cpu0/cache/index*'):
+        try:
+            with open(os.path.join(index_dir, 'type')) as f:
+                cache_type = f.read().strip()
+            with open(os.path.join(index_dir, 'level')) as f:
+                level = f.read().strip()
+            with open(os.path.join(index_dir, 'size')) as f:
+                text = f.read().strip()
+        except OSError:
+            continue
+        if cache_type == 'Instruction':
+            continue
+        sizes[f'L{level}'] = int(text[:-1]) * units[text[-1]] if text[-1] in units else int(text)
+    return sizes
+
+
+def _last_level_cache_size():
+    """读取末级缓存大小（字节），无法获取时返回None"""
+    return max(_cpu_cache_sizes().values(), default=None)
+
+
+def _default_array_bytes(memory_fraction):
+    """带宽类测试的默认数组大小：末级缓存的4倍（至少64MB），不超过内存预算的 1/memory_fraction"""
+    llc_size = _last_level_cache_size() or 32 * 1024 * 1024
+    array_bytes = max(64 * 1024 * 1024, 4 * llc_size)
+    return min(array_bytes, _memory_budget(memory_fraction))
+
+
+def _time_stream_kernels(n, scalar, repeats):
+    """分配三个长度为n的数组并对每个STREAM内核计时，返回各内核的最短耗时（秒）
+    
+    数组只在本函数内存活，返回时即被释放。
+    """
+    a = np.full(n, 1.0)
+    b = np.full(n, 2.0)
+    c = np.zeros(n)
+    block = np.empty(min(n, TRIAD_BLOCK_ELEMENTS))
+
+    def triad():
+        for start in range(0, n, len(block)):
+            end = min(start + len(block), n)
+            scaled = np.multiply(c[start:end], scalar, out=block[:end - start])
+            np.add(b[start:end], scaled, out=a[start:end])
+
+    kernels = {
+        'copy': lambda: np.copyto(c, a),
+        'scale': lambda: np.multiply(c, scalar, out=b),
+        'add': lambda: np.add(a, b, out=c),
+        'triad': triad,
+    }
+    best_times = {name: float('inf') for name in kernels}
+    for _ in range(repeats):
+        for name, kernel in kernels.items():
+            start_time = time.perf_counter()
+            kernel()
+            best_times[name] = min(best_times[name], time.perf_counter() - start_time)
+    return best_times
+
+
+def stream_bandwidth_test(array_mb=None, repeats=5):
+    """STREAM风格内存带宽测试（Copy、Scale、Add、Triad）
+    
+    按STREAM规则，每个数组至少为末级缓存的4倍，取多次运行中的最短时间。
+    所有内核都通过 out= 参数写入已分配的数组，避免产生临时数组。
+    NumPy没有融合的 a = b + scalar * c，Triad按 TRIAD_BLOCK_ELEMENTS 分块计算，
+    中间结果留在缓存中，因此内存流量与STREAM一致（读b、c，写a，计为3个数组）。
+    
+    Args:
+        array_mb: 单个数组大小（MB），None表示根据末级缓存大小自动选择
+        repeats: 每个内核的重复次数
+        
+    Returns:
+        dict: 包含各内核带宽（GB/s）的字典
+    """
+    print("正在进行STREAM内存带宽测试...")
+
+    if array_mb is None:
+        # 三个数组加余量，不超过内存预算的1/8
+        array_bytes = _default_array_bytes(memory_fraction=8)
+    else:
+        array_bytes = array_mb * 1024 * 1024
+
+    n = array_bytes // 8
+    print(f"  数组大小: {n * 8 / (1024 * 1024):.0f}MB x 3，重复 {repeats} 次")
+    with MemoryPhaseTracker() as tracker:
+        best_times = _time_stream_kernels(n, 3.0, repeats)
+
+    results = {'array_size_mb': n * 8 / (1024 * 1024), 'repeats': repeats, **tracker.report()}
+    for name, arrays_touched in STREAM_KERNEL_ARRAYS.items():
+        bandwidth = arrays_touched * n * 8 / best_times[name] / 1e9
+        results[name] = {
+            'best_time': best_times[name],
+            'bandwidth_gb_s': bandwidth
+        }
+        print(f"    {name.capitalize():<6} 带宽: {bandwidth:.2f} GB/s")
+    _print_phase_memory(results, indent="    ")
 
     return results
 
 
+def _detect_cache_levels(sizes, latencies, known_sizes=None, min_jump=1.15, max_levels=3):
+    """根据延迟曲线的跳变点推断缓存层级
+    
+    在相邻工作集大小之间延迟增幅的局部最大值处划分平台，最多取增幅最大的 max_levels 个跳变点。
+    若提供了系统报告的缓存大小（键为 'L1'、'L2' 等），则每个跳变点以2倍范围内最接近的层级命名，
+    否则按上一个层级的编号顺延命名；每个层级名称最多使用一次且编号随容量递增。最后一个平台为DRAM。
+    
+    Returns:
+        list: 每个平台的层级名称、推断的容量（字节）和中位延迟（纳秒）
+    """
+    ratios = [latencies[i + 1] / latencies[i] for i in range(len(latencies) - 1)]
+    candidates = [
+        i for i, ratio in enumerate(ratios)
+        if ratio >= min_jump
+        and (i == 0 or ratio >= ratios[i - 1])
+        and (i == len(ratios) - 1 or ratio >= ratios[i + 1])
+    ]
+    boundaries = sorted(sorted(candidates, key=lambda i: ratios[i], reverse=True)[:max_levels])
+
+    levels = []
+    start = 0
+    remaining = sorted(known_sizes or {}, key=known_sizes.get) if known_sizes else []
+    last_number = 0
+    for boundary in boundaries:
+        distances = {level: abs(math.log2(known_sizes[level] / sizes[boundary])) for level in remaining}
+        matches = [level for level, distance in distances.items() if distance <= 1]
+        name = min(matches, key=distances.get) if matches else f'L{last_number + 1}'
+        # 已使用的层级及编号更小的层级不再参与命名
+        last_number = int(name[1:])
+        remaining = [level for level in remaining if int(level[1:]) > last_number]
+        levels.append({
+            'level': name,
+            'size_bytes': sizes[boundary],
+            'latency_ns': statistics.median(latencies[start:boundary + 1])
+        })
+        start = boundary + 1
+    if start < len(latencies):
+        levels.append({
+            'level': 'DRAM',
+            'size_bytes': None,
+            'latency_ns': statistics.median(latencies[start:])
+        })
+    return levels
+
+
+def _fill_pointer_chain(chain, slots_per_line, rng):
+    """在int64数组中写入随机单环指针链，每个缓存行只使用第一个槽位"""
+    lines = len(chain) // slots_per_line
+    # 随机排列首尾相接构成单个环，指针以缓存行为单位跳转
+    order = rng.permutation(lines) * slots_per_line
+    chain.fill(0)
+    chain[order] = np.roll(order, -1)
+
+
+def _chase_latency_ns(links, steps, lines):
+    """沿指针链执行 steps 次依赖加载，返回每次加载的平均纳秒数"""
+    # 预热：走一遍环以加载缓存和TLB（小工作集多走几圈，让解释器循环进入稳定状态）
+    index = 0
+    for _ in range(max(10000, min(lines, steps))):
+        index = links[index]
+
+    start_time = time.perf_counter_ns()
+    for _ in range(steps):
+        index = links[index]
+    return (time.perf_counter_ns() - start_time) / steps
+
+
+@_track_workload_memory(trace_python=False)
+def memory_latency_test(min_kb=4, max_mb=None, steps=200000, line_size=64):
+    """指针追逐内存延迟测试
+    
+    在随机循环排列上逐个跟随指针（每次加载依赖上一次的结果），
+    工作集从 min_kb 按2倍递增到 max_mb，每个指针独占一个缓存行。
+    延迟中包含Python解释器每步的固定开销，因此各层级之间的差值比绝对值更有意义。
+    
+    Args:
+        min_kb: 最小工作集（KB）
+        max_mb: 最大工作集（MB），None表示取2GB与内存预算1/4中的较小值
+        steps: 每个工作集的依赖加载次数
+        line_size: 缓存行大小（字节）
+        
+    Returns:
+        dict: 包含延迟曲线和推断缓存层级的字典
+    """
+    print("正在进行指针追逐内存延迟测试...")
+
+    if max_mb is None:
+        max_bytes = min(2 * 1024 ** 3, _memory_budget(4))
+    else:
+        max_bytes = max_mb * 1024 * 1024
+
+    slots_per_line = line_size // 8
+    rng = np.random.default_rng(0)
+    curve = []
+    size = min_kb * 1024
+    while size <= max_bytes:
+        lines = max(2, size // line_size)
+        chain = np.empty(lines * slots_per_line, dtype=np.int64)
+        _fill_pointer_chain(chain, slots_per_line, rng)
+        links = chain.data
+        latency = _chase_latency_ns(links, steps, lines)
+
+        curve.append({'size_bytes': size, 'latency_ns': latency})
+        print(f"    工作集 {size // 1024:>8}KB: {latency:.2f} ns/次加载")
+
+        del links, chain
+        size *= 2
+
+    reported_sizes = _cpu_cache_sizes()
+    levels = _detect_cache_levels(
+        [point['size_bytes'] for point in curve],
+        [point['latency_ns'] for point in curve],
+        known_sizes=reported_sizes
+    ) if len(curve) > 1 else []
+
+    print("  推断的缓存层级:")
+    for level in levels:
+        capacity = f"{level['size_bytes'] // 1024}KB" if level['size_bytes'] else "-"
+        print(f"    {level['level']:<4} 容量: {capacity:>10}  延迟: {level['latency_ns']:.2f} ns")
+
+    return {
+        'steps_per_size': steps,
+        'line_size': line_size,
+        'curve': curve,
+        'cache_levels': levels,
+        'reported_cache_sizes': reported_sizes
+    }
+
+
+def _shared_bandwidth_worker(shm_name, offset, nbytes, repeats, barrier, result_queue):
+    """共享内存带宽测试的工作进程：在自己的区域内反复执行STREAM Copy"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        half = nbytes // 16
+        region = np.ndarray((half * 2,), dtype=np.float64, buffer=shm.buf, offset=offset)
+        src, dst = region[:half], region[half:]
+        # 由工作进程首次写入，使页面分配在其所在节点上
+        src.fill(1.0)
+        np.copyto(dst, src)
+
+        barrier.wait()
+        start_time = time.perf_counter()
+        for _ in range(repeats):
+            np.copyto(dst, src)
+        elapsed_time = time.perf_counter() - start_time
+
+        result_queue.put((2 * half * 8 * repeats, elapsed_time))
+        del region, src, dst
+    finally:
+        shm.close()
+
+
+def _collect_results(result_queue, workers, count, barrier=None, timeout=WORKER_TIMEOUT):
+    """从队列中收集 count 个工作进程结果
+    
+    工作进程异常退出或超时时中止屏障（使仍在等待的进程退出）、终止全部工作进程，
+    并抛出RuntimeError，避免主进程永久阻塞。
+    
+    Returns:
+        list: 按到达顺序排列的结果
+    """
+    results = []
+    deadline = time.monotonic() + timeout
+    while len(results) < count:
+        try:
+            results.append(result_queue.get(timeout=0.5))
+            continue
+        except queue.Empty:
+            pass
+        failed = [worker for worker in workers if worker.exitcode not in (None, 0)]
+        if failed or time.monotonic() > deadline:
+            if barrier is not None:
+                barrier.abort()
+            for worker in workers:
+                if worker.is_alive():
+                    worker.terminate()
+            for worker in workers:
+                worker.join()
+            if failed:
+                raise RuntimeError(f"工作进程异常退出（退出码 {failed[0].exitcode}）")
+            raise RuntimeError(f"等待工作进程结果超时（{timeout} 秒）")
+    return results
+
+
+def _usable_cpu_count():
+    """返回当前进程可运行的CPU数（受cpuset/亲和性限制），平台不支持亲和性时返回逻辑CPU数"""
+    try:
+        return len(psutil.Process().cpu_affinity()) or 1
+    except (AttributeError, psutil.Error, OSError):
+        return psutil.cpu_count(logical=True) or 1
+
+
+def _process_counts(max_processes):
+    """生成进程数序列：1、2、3、4、6、8、12、16……以及最大值"""
+    counts = {1, max_processes}
+    value = 2
+    while value <= max_processes:
+        counts.add(value)
+        if value * 3 // 2 <= max_processes:
+            counts.add(value * 3 // 2)
+        value *= 2
+    return sorted(counts)
+
+
+@_track_workload_memory(trace_python=False)
+def shared_memory_bandwidth_test(max_processes=None, region_mb=None, repeats=5, saturation_ratio=0.9):
+    """多进程内存带宽扩展测试
+    
+    1…N 个进程各自在同一 multiprocessing.shared_memory 块中的独立区域上执行STREAM Copy，
+    所有进程通过屏障同时开始。聚合带宽达到峰值 saturation_ratio 的最小进程数即为内存控制器饱和点。
+    
+    Args:
+        max_processes: 最大进程数，None表示使用当前进程可运行的全部CPU
+        region_mb: 每个进程的区域大小（MB），None表示根据末级缓存大小自动选择
+        repeats: 每个进程的Copy重复次数
+        saturation_ratio: 判定饱和的峰值带宽比例
+        
+    Returns:
+        dict: 包含各进程数聚合带宽和饱和点的字典
+    """
+    print("正在进行多进程内存带宽扩展测试...")
+
+    if max_processes is None or max_processes <= 0:
+        max_processes = _usable_cpu_count()
+
+    if region_mb is None:
+        region_bytes = max(64 * 1024 * 1024, 2 * (_last_level_cache_size() or 32 * 1024 * 1024))
+        # 所有区域合计不超过内存预算的1/2
+        region_bytes = min(region_bytes, _memory_budget(2 * max_processes))
+    else:
+        region_bytes = region_mb * 1024 * 1024
+    region_bytes = _cap_shared_region(region_bytes, max_processes)
+    region_bytes -= region_bytes % 16
+
+    print(f"  每个进程区域: {region_bytes / (1024 * 1024):.0f}MB，最多 {max_processes} 个进程")
+
+    shm = shared_memory.SharedMemory(create=True, size=region_bytes * max_processes)
+    scaling = []
+    try:
+        for count in _process_counts(max_processes):
+            barrier = multiprocessing.Barrier(count)
+            result_queue = multiprocessing.Queue()
+            workers = [
+                multiprocessing.Process(
+                    target=_shared_bandwidth_worker,
+                    args=(shm.name, i * region_bytes, region_bytes, repeats, barrier, result_queue)
+                )
+                for i in range(count)
+            ]
+            for worker in workers:
+                worker.start()
+            worker_results = _collect_results(result_queue, workers, count, barrier=barrier)
+            for worker in workers:
+                worker.join()
+
+            total_bytes = sum(nbytes for nbytes, _ in worker_results)
+            slowest = max(elapsed for _, elapsed in worker_results)
+            bandwidth = total_bytes / slowest / 1e9
+            scaling.append({
+                'processes': count,
+                'aggregate_bandwidth_gb_s': bandwidth,
+                'per_process_bandwidth_gb_s': bandwidth / count
+            })
+            print(f"    {count:>4} 个进程: {bandwidth:.2f} GB/s（每进程 {bandwidth / count:.2f} GB/s）")
+    finally:
+        shm.close()
+        shm.unlink()
+
+    peak = max(scaling, key=lambda point: point['aggregate_bandwidth_gb_s'])
+    saturation = next(
+        point for point in scaling
+        if point['aggregate_bandwidth_gb_s'] >= saturation_ratio * peak['aggregate_bandwidth_gb_s']
+    )
+    print(f"  峰值聚合带宽: {peak['aggregate_bandwidth_gb_s']:.2f} GB/s（{peak['processes']} 个进程）")
+    print(f"  饱和点: {saturation['processes']} 个进程")
+
+    return {
+        'region_size_mb': region_bytes / (1024 * 1024),
+        'repeats': repeats,
+        'scaling': scaling,
+        'peak_bandwidth_gb_s': peak['aggregate_bandwidth_gb_s'],
+        'peak_processes': peak['processes'],
+        'saturation_processes': saturation['processes']
+    }
+
+
+def _page_fault_count():
+    """返回当前进程累计的缺页次数，无法获取时返回None"""
+    if HAS_RESOURCE:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_minflt
+    try:
+        return psutil.Process().memory_info().num_page_faults
+    except AttributeError:
+        return None
+
+
+def _transparent_hugepage_mode():
+    """读取透明大页（THP）设置，仅支持Linux，无法获取时返回None"""
+    try:
+        with open('/sys/kernel/mm/transparent_hugepage/enabled') as f:
+            text = f.read()
+    except OSError:
+        return None
+    start, end = text.find('['), text.find(']')
+    return text[start + 1:end] if start >= 0 and end > start else text.strip()
+
+
+@_track_workload_memory()
+def page_fault_test(size_mb=256):
+    """缺页、首次访问与大页开销测试
+    
+    分别计时内存分配和逐页首次写入，对比 bytearray、匿名mmap、
+    MAP_POPULATE 预填充的mmap以及 madvise(MADV_HUGEPAGE) 的mmap（平台支持时）。
+    
+    Args:
+        size_mb: 每种方式分配的内存大小（MB），不超过内存预算的1/4
+        
+    Returns:
+        dict: 以分配方式为键的测试结果字典
+    """
+    print("正在进行缺页与首次访问开销测试...")
+
+    size = min(size_mb * 1024 * 1024, _memory_budget(4))
+    size -= size % mmap.PAGESIZE
+    page_size = mmap.PAGESIZE
+
+    def allocate_mmap(flags=0, advice=None):
+        # 私有匿名映射：透明大页对共享映射（shmem）遵循 shmem_enabled，默认不生效
+        if hasattr(mmap, 'MAP_PRIVATE'):
+            region = mmap.mmap(-1, size, flags=mmap.MAP_PRIVATE | mmap.MAP_ANONYMOUS | flags)
+        else:
+            region = mmap.mmap(-1, size)
+        if advice is not None:
+            region.madvise(advice)
+        return region
+
+    methods = {'bytearray': lambda: bytearray(size), 'mmap': allocate_mmap}
+    if hasattr(mmap, 'MAP_POPULATE'):
+        methods['mmap_populate'] = lambda: allocate_mmap(flags=mmap.MAP_POPULATE)
+    if hasattr(mmap, 'MADV_HUGEPAGE') and hasattr(mmap.mmap, 'madvise'):
+        methods['mmap_hugepage'] = lambda: allocate_mmap(advice=mmap.MADV_HUGEPAGE)
+
+    print(f"  区域大小: {size // (1024 * 1024)}MB，页面大小: {page_size}B，透明大页: {_transparent_hugepage_mode()}")
+    results = {'size_mb': size / (1024 * 1024), 'page_size': page_size,
+               'transparent_hugepage': _transparent_hugepage_mode()}
+    for name, allocate in methods.items():
+        faults_before = _page_fault_count()
+        start_time = time.perf_counter()
+        buffer = allocate()
+        allocation_time = time.perf_counter() - start_time
+        faults_after_allocation = _page_fault_count()
+
+        # 每页写入一个字节，触发首次访问缺页
+        pages = np.frombuffer(buffer, dtype=np.uint8)
+        start_time = time.perf_counter()
+        pages[::page_size] = 1
+        touch_time = time.perf_counter() - start_time
+        faults_after_touch = _page_fault_count()
+
+        del pages
+        if isinstance(buffer, mmap.mmap):
+            buffer.close()
+        del buffer
+
+        result = {
+            'allocation_time': allocation_time,
+            'touch_time': touch_time,
+            'first_touch_gb_s': size / touch_time / 1e9 if touch_time > 0 else float('inf'),
+            'total_gb_s': size / (allocation_time + touch_time) / 1e9
+        }
+        if faults_before is not None:
+            touch_faults = faults_after_touch - faults_after_allocation
+            result['allocation_faults'] = faults_after_allocation - faults_before
+            result['touch_faults'] = touch_faults
+            result['faults_per_second'] = touch_faults / touch_time if touch_time > 0 else 0
+        results[name] = result
+
+        print(f"    {name:<14} 分配: {allocation_time * 1000:8.2f} 毫秒  "
+              f"首次访问: {touch_time * 1000:8.2f} 毫秒 ({result['first_touch_gb_s']:.2f} GB/s)"
+              + (f"  缺页: {result['touch_faults']} ({result['faults_per_second']:.0f} 次/秒)"
+                 if 'touch_faults' in result else ""))
+
+    return results
+
+
+def _best_time(operation, repeats):
+    """重复执行操作，返回最短耗时（秒）"""
+    best = float('inf')
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        operation()
+        best = min(best, time.perf_counter() - start_time)
+    return best
+
+
+def _time_block_orders(data, block_size, rng, repeats):
+    """按顺序、逆序和随机顺序收集 data 中大小为 block_size 的块，返回各顺序的带宽
+    
+    收集缓冲区只在本函数内存活，返回时即被释放。
+    """
+    elements = block_size // 8
+    count = len(data) // elements
+    blocks = data[:count * elements].reshape(count, elements)
+    gathered = np.empty_like(blocks)
+    orders = {
+        'sequential': np.arange(count),
+        'reverse': np.arange(count)[::-1].copy(),
+        'random': rng.permutation(count),
+    }
+    results = []
+    for order_name, order in orders.items():
+        # mode='clip' 使 np.take 直接写入 out，避免额外的中间缓冲
+        elapsed = _best_time(lambda: np.take(blocks, order, axis=0, out=gathered, mode='clip'), repeats)
+        bandwidth = count * block_size / elapsed / 1e9
+        results.append({
+            'block_bytes': block_size,
+            'order': order_name,
+            'bandwidth_gb_s': bandwidth
+        })
+        print(f"    块 {block_size:>6}B {order_name:<10}: {bandwidth:.2f} GB/s")
+    return results
+
+
+@_track_workload_memory(trace_python=False)
+def access_pattern_test(array_mb=None, max_stride_bytes=64 * 1024, block_sizes=(64, 4096, 65536),
+                        repeats=3, line_size=64):
+    """访问模式测试：步长扫描和块顺序（顺序、逆序、随机）
+    
+    步长扫描按 8B 到 max_stride_bytes 的步长读取并求和，同时报告有效数据带宽和
+    按实际访问缓存行计算的带宽，用于观察硬件预取器失效的位置。
+    块顺序测试将数组划分为固定大小的块，按顺序、逆序或随机顺序将块收集到缓冲区。
+    
+    Args:
+        array_mb: 数组大小（MB），None表示根据末级缓存大小自动选择
+        max_stride_bytes: 最大步长（字节）
+        block_sizes: 块顺序测试使用的块大小（字节）
+        repeats: 每种模式的重复次数，取最短时间
+        line_size: 缓存行大小（字节）
+        
+    Returns:
+        dict: 包含各访问模式带宽的字典
+    """
+    print("正在进行内存访问模式测试...")
+
+    if array_mb is None:
+        # 数组和收集缓冲区，不超过内存预算的1/4
+        array_bytes = _default_array_bytes(memory_fraction=4)
+    else:
+        array_bytes = array_mb * 1024 * 1024
+    n = array_bytes // 8
+    data = np.ones(n)
+
+    print(f"  数组大小: {n * 8 / (1024 * 1024):.0f}MB")
+    print("  步长扫描:")
+    strides = []
+    stride = 1
+    while stride * 8 <= max_stride_bytes:
+        view = data[::stride]
+        elapsed = _best_time(view.sum, repeats)
+        # 步长小于缓存行时所有缓存行都被访问
+        lines_touched = len(view) if stride * 8 >= line_size else n * 8 // line_size
+        strides.append({
+            'stride_bytes': stride * 8,
+            'useful_gb_s': len(view) * 8 / elapsed / 1e9,
+            'effective_gb_s': lines_touched * line_size / elapsed / 1e9,
+            'ns_per_element': elapsed / len(view) * 1e9
+        })
+        print(f"    步长 {stride * 8:>6}B: 有效数据 {strides[-1]['useful_gb_s']:7.2f} GB/s  "
+              f"缓存行 {strides[-1]['effective_gb_s']:7.2f} GB/s  "
+              f"{strides[-1]['ns_per_element']:.2f} ns/元素")
+        stride *= 2
+    del view
+
+    print("  块顺序:")
+    rng = np.random.default_rng(0)
+    block_orders = []
+    for block_size in block_sizes:
+        block_orders.extend(_time_block_orders(data, block_size, rng, repeats))
+
+    del data
+    return {
+        'array_size_mb': n * 8 / (1024 * 1024),
+        'line_size': line_size,
+        'strides': strides,
+        'block_orders': block_orders
+    }
+
+
+def _pin_to_cpus(cpus):
+    """将当前进程绑定到指定CPU
+    
+    Returns:
+        bool: 是否绑定成功；平台不支持亲和性或绑定失败时返回False
+    """
+    try:
+        psutil.Process().cpu_affinity(cpus)
+        return True
+    except (AttributeError, psutil.Error, OSError):
+        return False
+
+
+def _numa_touch_worker(shm_name, cpus, chain_bytes, stream_bytes, line_size, done_queue):
+    """NUMA测试的首次写入进程：在内存节点的CPU上写入整个区域，使页面分配在该节点"""
+    pinned = _pin_to_cpus(cpus)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        chain = np.ndarray((chain_bytes // 8,), dtype=np.int64, buffer=shm.buf)
+        stream = np.ndarray((stream_bytes // 8,), dtype=np.float64, buffer=shm.buf, offset=chain_bytes)
+        _fill_pointer_chain(chain, line_size // 8, np.random.default_rng(0))
+        stream.fill(1.0)
+        del chain, stream
+    finally:
+        shm.close()
+    done_queue.put(pinned)
+
+
+def _numa_measure_worker(shm_name, cpus, chain_bytes, stream_bytes, line_size, steps, repeats, result_queue):
+    """NUMA测试的测量进程：在CPU节点上测量指针追逐延迟和读取带宽"""
+    pinned = _pin_to_cpus(cpus)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        chain = np.ndarray((chain_bytes // 8,), dtype=np.int64, buffer=shm.buf)
+        stream = np.ndarray((stream_bytes // 8,), dtype=np.float64, buffer=shm.buf, offset=chain_bytes)
+        latency = _chase_latency_ns(chain.data, steps, chain_bytes // line_size)
+
+        best = float('inf')
+        for _ in range(repeats):
+            start_time = time.perf_counter()
+            stream.sum()
+            best = min(best, time.perf_counter() - start_time)
+        del chain, stream
+    finally:
+        shm.close()
+    result_queue.put((latency, stream_bytes / best / 1e9, pinned))
+
+
+@_track_workload_memory(trace_python=False)
+def numa_matrix_test(region_mb=None, steps=200000, repeats=3, line_size=64):
+    """NUMA节点间内存延迟与带宽矩阵测试
+    
+    对每个内存节点，先由绑定在该节点CPU上的进程首次写入一块共享内存，
+    再依次由绑定在各CPU节点上的进程测量指针追逐延迟和读取带宽。
+    单节点系统（或无法读取NUMA拓扑的平台）退化为1x1矩阵。
+    平台不支持CPU亲和性或绑定失败时，结果中 pinned 为False，矩阵不代表节点间差异。
+    
+    Args:
+        region_mb: 延迟和带宽区域各自的大小（MB），None表示根据末级缓存大小自动选择
+        steps: 指针追逐的依赖加载次数
+        repeats: 读取带宽的重复次数
+        line_size: 缓存行大小（字节）
+        
+    Returns:
+        dict: 包含节点列表、延迟矩阵和带宽矩阵的字典（行为CPU节点，列为内存节点）
+    """
+    from system_info import get_numa_topology
+
+    print("正在进行NUMA内存延迟与带宽矩阵测试...")
+
+    topology = {node: cpus for node, cpus in get_numa_topology().items() if cpus}
+    nodes = list(topology)
+    if region_mb is None:
+        # 延迟和带宽两个区域，不超过内存预算的1/4
+        region_bytes = _default_array_bytes(memory_fraction=8)
+    else:
+        region_bytes = region_mb * 1024 * 1024
+    # 延迟和带宽两个区域放在同一块共享内存中
+    region_bytes = _cap_shared_region(region_bytes, 2)
+    region_bytes -= region_bytes % line_size
+
+    print(f"  NUMA节点: {len(nodes)}，每个区域: {region_bytes / (1024 * 1024):.0f}MB")
+
+    pinned = True
+    latency_matrix = [[None] * len(nodes) for _ in nodes]
+    bandwidth_matrix = [[None] * len(nodes) for _ in nodes]
+    for mem_index, mem_node in enumerate(nodes):
+        shm = shared_memory.SharedMemory(create=True, size=2 * region_bytes)
+        try:
+            done_queue = multiprocessing.Queue()
+            toucher = multiprocessing.Process(
+                target=_numa_touch_worker,
+                args=(shm.name, topology[mem_node], region_bytes, region_bytes, line_size, done_queue)
+            )
+            toucher.start()
+            pinned &= _collect_results(done_queue, [toucher], 1)[0]
+            toucher.join()
+
+            for cpu_index, cpu_node in enumerate(nodes):
+                result_queue = multiprocessing.Queue()
+                measurer = multiprocessing.Process(
+                    target=_numa_measure_worker,
+                    args=(shm.name, topology[cpu_node], region_bytes, region_bytes,
+                          line_size, steps, repeats, result_queue)
+                )
+                measurer.start()
+                latency, bandwidth, measure_pinned = _collect_results(result_queue, [measurer], 1)[0]
+                measurer.join()
+                pinned &= measure_pinned
+                latency_matrix[cpu_index][mem_index] = latency
+                bandwidth_matrix[cpu_index][mem_index] = bandwidth
+                print(f"    CPU节点 {cpu_node} -> 内存节点 {mem_node}: "
+                      f"延迟 {latency:.2f} ns, 带宽 {bandwidth:.2f} GB/s")
+        finally:
+            shm.close()
+            shm.unlink()
+
+    if not pinned:
+        print("  警告: 无法将测试进程绑定到节点CPU，以下矩阵不代表节点间差异")
+    header = "".join(f"{'mem' + str(node):>12}" for node in nodes)
+    print(f"  延迟矩阵 (ns):\n    {'':>6}{header}")
+    for cpu_index, cpu_node in enumerate(nodes):
+        print(f"    {'cpu' + str(cpu_node):>6}" + "".join(f"{value:>12.2f}" for value in latency_matrix[cpu_index]))
+    print(f"  带宽矩阵 (GB/s):\n    {'':>6}{header}")
+    for cpu_index, cpu_node in enumerate(nodes):
+        print(f"    {'cpu' + str(cpu_node):>6}" + "".join(f"{value:>12.2f}" for value in bandwidth_matrix[cpu_index]))
+
+    return {
+        'nodes': nodes,
+        'node_cpus': topology,
+        'pinned': pinned,
+        'region_size_mb': region_bytes / (1024 * 1024),
+        'latency_ns': latency_matrix,
+        'bandwidth_gb_s': bandwidth_matrix
+    }
+
+
+class _GraphNode:
+    """对象图测试使用的普通实例（带 __dict__）"""
+
+    def __init__(self, value, parent):
+        self.value = value
+        self.parent = parent
+
+
+class _SlotsGraphNode:
+    """对象图测试使用的 __slots__ 实例"""
+    __slots__ = ('value', 'parent')
+
+    def __init__(self, value, parent):
+        self.value = value
+        self.parent = parent
+
+
+@_track_workload_memory(trace_python=False)
+def object_gc_test(object_count=200000, rounds=3, tuned_threshold=(50000, 20, 100)):
+    """Python对象分配与垃圾回收暂停测试
+    
+    反复构建并释放由小对象组成的对象图（每个节点引用其父节点 i//2），
+    对象类型包括 dict、tuple、普通实例和 __slots__ 实例。
+    通过 gc.callbacks 记录每次垃圾回收的暂停时间，分别在默认阈值和调优阈值下运行。
+    
+    Args:
+        object_count: 每轮构建的对象数量
+        rounds: 每种对象类型的构建/释放轮数
+        tuned_threshold: 调优配置使用的 gc.set_threshold 参数
+        
+    Returns:
+        dict: 以阈值配置和对象类型为键的测试结果字典
+    """
+    print("正在进行Python对象分配与GC暂停测试...")
+
+    factories = {
+        'dict': lambda value, parent: {'value': value, 'parent': parent},
+        'tuple': lambda value, parent: (value, parent),
+        'instance': _GraphNode,
+        'slots_instance': _SlotsGraphNode,
+    }
+    default_threshold = gc.get_threshold()
+    configs = {'default': default_threshold, 'tuned': tuple(tuned_threshold)}
+
+    pauses = []
+    pause_start = [0]
+
+    def gc_callback(phase, info):
+        if phase == 'start':
+            pause_start[0] = time.perf_counter_ns()
+        else:
+            pauses.append((info['generation'], time.perf_counter_ns() - pause_start[0]))
+
+    process = psutil.Process()
+    results = {'object_count': object_count, 'rounds': rounds}
+    gc.callbacks.append(gc_callback)
+    try:
+        for config_name, threshold in configs.items():
+            gc.set_threshold(*threshold)
+            print(f"  GC阈值 {config_name}: {threshold}")
+            results[config_name] = {'threshold': threshold}
+            for kind, factory in factories.items():
+                gc.collect()
+                pauses.clear()
+                baseline_rss = process.memory_info().rss
+                build_time = 0.0
+                teardown_time = 0.0
+                graph_rss = 0
+                for _ in range(rounds):
+                    start_time = time.perf_counter()
+                    nodes = [factory(0, None)]
+                    for i in range(1, object_count):
+                        nodes.append(factory(i, nodes[i // 2]))
+                    build_time += time.perf_counter() - start_time
+                    graph_rss = max(graph_rss, process.memory_info().rss - baseline_rss)
+
+                    start_time = time.perf_counter()
+                    del nodes
+                    teardown_time += time.perf_counter() - start_time
+
+                durations = sorted(duration for _, duration in pauses)
+                result = {
+                    'allocations_per_second': object_count * rounds / build_time,
+                    'build_time': build_time,
+                    'teardown_time': teardown_time,
+                    'graph_rss_mb': graph_rss / (1024 * 1024),
+                    'gc_collections': len(durations),
+                    'gc_collections_by_generation': {
+                        generation: sum(1 for g, _ in pauses if g == generation) for generation in range(3)
+                    },
+                    'gc_pause_total_ms': sum(durations) / 1e6,
+                    'gc_pause_max_ms': durations[-1] / 1e6 if durations else 0,
+                    'gc_pause_p99_ms': durations[int(len(durations) * 0.99)] / 1e6 if durations else 0,
+                }
+                results[config_name][kind] = result
+                print(f"    {kind:<15} {result['allocations_per_second']:>12.0f} 对象/秒  "
+                      f"GC {result['gc_collections']:>5} 次，总暂停 {result['gc_pause_total_ms']:8.2f} 毫秒，"
+                      f"最大 {result['gc_pause_max_ms']:.2f} 毫秒")
+    finally:
+        gc.callbacks.remove(gc_callback)
+        gc.set_threshold(*default_threshold)
+    return results
+
+
+@_track_workload_memory(trace_python=False)
+def buffer_copy_test(sizes_kb=(4, 64, 1024, 16384), chunks=16, target_mb=256):
+    """拷贝与零拷贝缓冲区操作对比测试
+    
+    每组操作分别用拷贝方式和零拷贝方式处理同一缓冲区：
+    bytes切片与memoryview切片、b''.join拼接与预分配bytearray的readinto填充、
+    bytes(buf)与memoryview(buf)转换、numpy.array(buf)与numpy.frombuffer(buf)。
+    分配量在单独的未计时运行中由 tracemalloc 的峰值得出。
+    
+    Args:
+        sizes_kb: 缓冲区大小列表（KB）
+        chunks: 拼接/填充测试中每个缓冲区分成的块数
+        target_mb: 每种操作每个大小累计处理的数据量（MB）
+        
+    Returns:
+        dict: 以缓冲区大小为键、包含每种操作带宽和分配量的字典
+    """
+    print("正在进行拷贝与零拷贝缓冲区操作测试...")
+
+    results = {}
+    for size_kb in sizes_kb:
+        size = size_kb * 1024
+        chunk = size // chunks
+        source = os.urandom(size)
+        source_array = bytearray(source)
+        reader = io.BytesIO(source)
+        target = bytearray(size)
+        target_view = memoryview(target)
+
+        def join_chunks():
+            reader.seek(0)
+            return b''.join([reader.read(chunk) for _ in range(chunks)])
+
+        def readinto_chunks():
+            reader.seek(0)
+            for offset in range(0, size, chunk):
+                reader.readinto(target_view[offset:offset + chunk])
+            return target
+
+        operations = {
+            'bytes_slice': lambda: source[1:],
+            'memoryview_slice': lambda: memoryview(source)[1:],
+            'bytes_join': join_chunks,
+            'bytearray_readinto': readinto_chunks,
+            'bytes_conversion': lambda: bytes(source_array),
+            'memoryview_conversion': lambda: memoryview(source_array),
+            'numpy_array': lambda: np.array(source_array, dtype=np.uint8),
+            'numpy_frombuffer': lambda: np.frombuffer(source_array, dtype=np.uint8),
+        }
+
+        iterations = max(1, min(100000, target_mb * 1024 * 1024 // size))
+        print(f"  缓冲区 {size_kb}KB（{iterations} 次）:")
+        results[f'{size_kb}KB'] = {}
+        for name, operation in operations.items():
+            start_time = time.perf_counter()
+            for _ in range(iterations):
+                operation()
+            elapsed_time = time.perf_counter() - start_time
+
+            tracemalloc.start()
+            try:
+                kept = operation()
+                _, allocated = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            # 释放对 source_array 的导出视图，后续操作才能继续使用它
+            if isinstance(kept, memoryview):
+                kept.release()
+            del kept
+
+            bandwidth = size * iterations / elapsed_time / 1e9 if elapsed_time > 0 else float('inf')
+            results[f'{size_kb}KB'][name] = {
+                'bandwidth_gb_s': bandwidth,
+                'allocated_bytes': allocated
+            }
+            print(f"    {name:<22} {bandwidth:10.2f} GB/s  分配 {allocated:>10} B/次")
+
+        target_view.release()
+
+    return results
+
+
+@_track_workload_memory()
+def memtest_soak_test(fraction=0.5, passes=3, block_mb=64, seed=0, max_reported_errors=16):
+    """内存完整性老化测试（memtest-lite）
+    
+    用NumPy生成的图案（走步1、地址即内容、带种子的随机数）填满内存预算的一部分，
+    然后多次重新读取并逐字校验，报告写入和校验带宽以及不匹配的字节偏移。
+    
+    Args:
+        fraction: 使用内存预算的比例
+        passes: 每种图案的校验轮数
+        block_mb: 每个内存块的大小（MB）
+        seed: 随机图案的种子
+        max_reported_errors: 每种图案最多记录的错误偏移数
+        
+    Returns:
+        dict: 包含各图案带宽、错误数和错误偏移的字典
+    """
+    print("正在进行内存完整性老化测试...")
+
+    elements = block_mb * 1024 * 1024 // 8
+    elements -= elements % 64
+    block_bytes = elements * 8
+    # 预留期望值缓冲区、地址图案的偏移数组和比较掩码（共约2.1个块），图案均在这些缓冲区内原地生成
+    block_count = max(1, (int(_memory_budget() * fraction) - 3 * block_bytes) // block_bytes)
+    total_bytes = block_count * block_bytes
+    print(f"  测试量: {total_bytes / 1024 ** 3:.2f} GB（{block_count} 个 {block_mb}MB 块），每种图案校验 {passes} 轮")
+
+    blocks = [np.empty(elements, dtype=np.uint64) for _ in range(block_count)]
+    expected = np.empty(elements, dtype=np.uint64)
+    mismatch = np.empty(elements, dtype=bool)
+    walking_row = np.left_shift(np.uint64(1), np.arange(64, dtype=np.uint64))
+    byte_offsets = np.arange(elements, dtype=np.uint64)
+    np.multiply(byte_offsets, np.uint64(8), out=byte_offsets)
+
+    def fill_expected(pattern, block_index):
+        if pattern == 'walking_ones':
+            np.copyto(expected.reshape(-1, 64), walking_row)
+        elif pattern == 'address':
+            np.add(byte_offsets, np.uint64(block_index * block_bytes), out=expected)
+        else:
+            # 分段生成随机数，临时数组不超过 MEMTEST_RANDOM_CHUNK 个元素
+            generator = np.random.PCG64(seed + block_index)
+            for start in range(0, elements, MEMTEST_RANDOM_CHUNK):
+                end = min(start + MEMTEST_RANDOM_CHUNK, elements)
+                expected[start:end] = generator.random_raw(end - start)
+
+    results = {'total_gb': total_bytes / 1024 ** 3, 'passes': passes, 'patterns': {}}
+    total_errors = 0
+    try:
+        for pattern in ('walking_ones', 'address', 'random'):
+            start_time = time.perf_counter()
+            for block_index, block in enumerate(blocks):
+                fill_expected(pattern, block_index)
+                np.copyto(block, expected)
+            write_time = time.perf_counter() - start_time
+
+            errors = 0
+            error_offsets = []
+            start_time = time.perf_counter()
+            for _ in range(passes):
+                for block_index, block in enumerate(blocks):
+                    fill_expected(pattern, block_index)
+                    np.not_equal(block, expected, out=mismatch)
+                    block_errors = int(np.count_nonzero(mismatch))
+                    if block_errors:
+                        errors += block_errors
+                        for index in np.flatnonzero(mismatch)[:max_reported_errors - len(error_offsets)]:
+                            error_offsets.append(block_index * block_bytes + int(index) * 8)
+            verify_time = time.perf_counter() - start_time
+
+            total_errors += errors
+            results['patterns'][pattern] = {
+                'write_gb_s': total_bytes / write_time / 1e9,
+                'verify_gb_s': total_bytes * passes / verify_time / 1e9,
+                'errors': errors,
+                'error_offsets': error_offsets
+            }
+            print(f"    {pattern:<13} 写入 {results['patterns'][pattern]['write_gb_s']:.2f} GB/s  "
+                  f"校验 {results['patterns'][pattern]['verify_gb_s']:.2f} GB/s  错误 {errors}")
+            for offset in error_offsets:
+                print(f"      不匹配偏移: 0x{offset:x}")
+    finally:
+        del blocks
+
+    results['total_errors'] = total_errors
+    results['passed'] = total_errors == 0
+    print(f"  结果: {'通过' if total_errors == 0 else f'失败（{total_errors} 个错误）'}")
+    return results
+
+
+def _background_stream_worker(cpus, array_bytes, ready_queue, stop_event, result_queue):
+    """负载延迟测试的背景进程：持续执行STREAM Copy直到收到停止信号"""
+    _pin_to_cpus(cpus)
+    n = array_bytes // 8
+    src = np.full(n, 1.0)
+    dst = np.empty(n)
+    np.copyto(dst, src)
+    ready_queue.put(True)
+
+    copies = 0
+    start_time = time.perf_counter()
+    while not stop_event.is_set():
+        np.copyto(dst, src)
+        copies += 1
+    elapsed_time = time.perf_counter() - start_time
+    result_queue.put(2 * n * 8 * copies / elapsed_time / 1e9 if elapsed_time > 0 else 0.0)
+
+
+@_track_workload_memory(trace_python=False)
+def loaded_latency_test(max_workers=None, chain_mb=None, worker_mb=None, steps=200000, line_size=64):
+    """负载下的内存延迟测试
+    
+    主进程绑定在一个CPU上执行指针追逐，同时由 0…N 个绑定在其他CPU上的背景进程持续执行STREAM Copy，
+    报告延迟随背景带宽变化的曲线。
+    
+    Args:
+        max_workers: 最大背景进程数，None表示使用除延迟核心外当前进程可运行的全部CPU
+        chain_mb: 指针链工作集大小（MB），None表示根据末级缓存大小自动选择
+        worker_mb: 每个背景进程的数组大小（MB），None表示根据末级缓存大小自动选择
+        steps: 每个负载级别的依赖加载次数
+        line_size: 缓存行大小（字节）
+        
+    Returns:
+        dict: 包含各负载级别延迟和背景带宽的字典
+    """
+    print("正在进行负载下的内存延迟测试...")
+
+    cpu_count = _usable_cpu_count()
+    if max_workers is None:
+        max_workers = cpu_count - 1
+    chain_bytes = chain_mb * 1024 * 1024 if chain_mb else _default_array_bytes(memory_fraction=8)
+    chain_bytes -= chain_bytes % line_size
+    if worker_mb:
+        worker_bytes = worker_mb * 1024 * 1024
+    else:
+        # 每个背景进程两个数组，合计不超过内存预算的1/2
+        worker_bytes = min(_default_array_bytes(memory_fraction=8),
+                           _memory_budget(4 * max(1, max_workers)))
+
+    print(f"  指针链: {chain_bytes / (1024 * 1024):.0f}MB，背景进程数组: {worker_bytes / (1024 * 1024):.0f}MB x 2，"
+          f"最多 {max_workers} 个背景进程")
+
+    process = psutil.Process()
+    try:
+        original_affinity = process.cpu_affinity()
+    except (AttributeError, psutil.Error):
+        original_affinity = None
+    latency_cpu = original_affinity[0] if original_affinity else 0
+    background_cpus = [cpu for cpu in (original_affinity or range(cpu_count)) if cpu != latency_cpu] or [latency_cpu]
+    lines = chain_bytes // line_size
+    worker_counts = [0] + (_process_counts(max_workers) if max_workers > 0 else [])
+    curve = []
+    # 绑定和指针链初始化都在 try 内，出错时也会恢复原来的CPU亲和性
+    try:
+        _pin_to_cpus([latency_cpu])
+        chain = np.empty(chain_bytes // 8, dtype=np.int64)
+        _fill_pointer_chain(chain, line_size // 8, np.random.default_rng(0))
+
+        for count in worker_counts:
+            ready_queue = multiprocessing.Queue()
+            result_queue = multiprocessing.Queue()
+            stop_event = multiprocessing.Event()
+            workers = [
+                multiprocessing.Process(
+                    target=_background_stream_worker,
+                    args=([background_cpus[i % len(background_cpus)]], worker_bytes,
+                          ready_queue, stop_event, result_queue)
+                )
+                for i in range(count)
+            ]
+            for worker in workers:
+                worker.start()
+            _collect_results(ready_queue, workers, count)
+
+            latency = _chase_latency_ns(chain.data, steps, lines)
+
+            stop_event.set()
+            background_bandwidth = sum(_collect_results(result_queue, workers, count))
+            for worker in workers:
+                worker.join()
+
+            curve.append({
+                'background_workers': count,
+                'background_bandwidth_gb_s': background_bandwidth,
+                'latency_ns': latency
+            })
+            print(f"    {count:>4} 个背景进程: 背景带宽 {background_bandwidth:7.2f} GB/s  延迟 {latency:.2f} ns")
+    finally:
+        if original_affinity:
+            _pin_to_cpus(original_affinity)
+
+    idle_latency = curve[0]['latency_ns']
+    for point in curve:
+        point['latency_vs_idle'] = point['latency_ns'] / idle_latency
+
+    return {
+        'chain_size_mb': chain_bytes / (1024 * 1024),
+        'worker_array_mb': worker_bytes / (1024 * 1024),
+        'steps': steps,
+        'idle_latency_ns': idle_latency,
+        'curve': curve
+    }
+
+
 if __name__ == "__main__":
     # 测试代码
     print("内存性能测试示例")
@@ -68,4 +1439,7 @@ if __name__ == "__main__":
     
     print("\n测试结果摘要:")
     for size, data in results.items():
-        print(f"{size} 内存分配吞吐量: {data['throughput_mb_s']:.2f} MB/s")
\ No newline at end of file
+        print(f"{size} 内存分配吞吐量: {data['throughput_mb_s']:.2f} MB/s")
+    
+    stream_results = stream_bandwidth_test()
+    print(f"Triad 带宽: {stream_results['triad']['bandwidth_gb_s']:.2f} GB/s")
\ No newline at end of file
@@ -39,16 +39,28 @@ def calculate_scores(results):
     else:
         scores['cpu_multi_thread'] = 0
     
-    # 内存得分
-    if 'memory' in results and '1024KB' in results['memory']:
+    # 内存得分：优先使用STREAM Triad带宽（以1 GB/s为基准），旧报告回退到1MB分配吞吐量
+    if results.get('memory_bandwidth') and 'triad' in results['memory_bandwidth']:
+        scores['memory'] = results['memory_bandwidth']['triad']['bandwidth_gb_s'] / 1.0
+    elif 'memory' in results and '1024KB' in results['memory']:
         scores['memory'] = results['memory']['1024KB']['throughput_mb_s'] / 100
     else:
         scores['memory'] = 0
     
-    # 磁盘I/O得分
-    if 'disk_io' in results:
-        scores['disk_write'] = results['disk_io']['write_speed_mb_s'] / 100
-        scores['disk_read'] = results['disk_io']['read_speed_mb_s'] / 75
+    # 磁盘I/O得分：优先使用绕过页缓存的结果，旧报告或不支持的平台回退到页缓存结果；
+    # tmpfs/overlay 目标测到的是内存或叠加层，除非显式允许，否则不计分
+    disk = results.get('disk_io')
+    target = (disk or {}).get('target') or {}
+    if disk and target.get('non_disk') and not disk.get('allow_non_disk'):
+        scores['disk_write'] = 0
+        scores['disk_read'] = 0
+        scores['disk_excluded'] = f"{target['fstype']} ({target['mountpoint']})"
+    elif disk:
+        write_speed = disk.get('write_sync_speed_mb_s') or disk['write_speed_mb_s']
+        read_speed = (disk.get('read_uncached_speed_mb_s') or disk.get('direct_read_speed_mb_s')
+                      or disk['read_speed_mb_s'])
+        scores['disk_write'] = write_speed / 100
+        scores['disk_read'] = read_speed / 75
     else:
         scores['disk_write'] = 0
         scores['disk_read'] = 0
@@ -96,6 +108,8 @@ def print_report(system_info, results, scores):
     print(f"内存性能得分: {scores['memory']:.1f}")
     print(f"磁盘写入性能得分: {scores['disk_write']:.1f}")
     print(f"磁盘读取性能得分: {scores['disk_read']:.1f}")
+    if scores.get('disk_excluded'):
+        print(f"  注意: 磁盘测试目标为 {scores['disk_excluded']}，不代表磁盘性能，未计分")
     print(f"GPU性能得分: {scores['gpu']:.1f}")
     print("-" * 40)
     print(f"综合性能得分: {scores['total']:.1f}")
@@ -145,6 +159,7 @@ if __name__ == "__main__":
         'cpu_single_thread': {'operations_per_second': 50000},
         'cpu_multi_thread': {'operations_per_second': 5000000},
         'memory': {'1024KB': {'throughput_mb_s': 5000}},
+        'memory_bandwidth': {'triad': {'bandwidth_gb_s': 15}},
         'disk_io': {'write_speed_mb_s': 500, 'read_speed_mb_s': 600},
         'gpu': {'cpu_gflops': 50, 'gpu_gflops': 500}
     }
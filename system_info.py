@@ -42,6 +42,43 @@ except ImportError:
     print("警告: 未安装pythonnet库，无法使用OpenHardwareMonitor。请使用 'pip install pythonnet' 安装。")
 
 
+def _parse_cpulist(text):
+    """解析形如 '0-3,8-11' 的CPU列表"""
+    cpus = []
+    for part in text.strip().split(','):
+        if not part:
+            continue
+        if '-' in part:
+            start, end = part.split('-')
+            cpus.extend(range(int(start), int(end) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def get_numa_topology():
+    """读取NUMA拓扑（仅支持Linux sysfs）
+    
+    Returns:
+        dict: 节点编号 -> CPU列表；无法读取时返回包含全部CPU的单节点拓扑
+    """
+    topology = {}
+    node_root = '/sys/devices/system/node'
+    if os.path.isdir(node_root):
+        for name in os.listdir(node_root):
+            match = re.fullmatch(r'node(\d+)', name)
+            if not match:
+                continue
+            try:
+                with open(os.path.join(node_root, name, 'cpulist')) as f:
+                    topology[int(match.group(1))] = _parse_cpulist(f.read())
+            except (OSError, ValueError):
+                continue
+    if not topology:
+        topology = {0: list(range(psutil.cpu_count(logical=True) or 1))}
+    return dict(sorted(topology.items()))
+
+
 def get_system_info():
     """获取系统信息"""
     info = {
@@ -52,6 +89,7 @@ def get_system_info():
         'logical_cpu_count': psutil.cpu_count(logical=True),
         'total_memory': psutil.virtual_memory().total,
         'available_memory': psutil.virtual_memory().available,
+        'numa_nodes': len(get_numa_topology()),
     }
     
     # 获取GPU信息 - 使用多种方法提高检测成功率
@@ -177,6 +215,8 @@ def print_system_info(system_info):
     print(f"{lang.get('logical_cpu_cores')}: {system_info['logical_cpu_count']}")
     print(f"{lang.get('total_memory')}: {system_info['total_memory'] / (1024 ** 3):.2f} GB")
     print(f"{lang.get('available_memory')}: {system_info['available_memory'] / (1024 ** 3):.2f} GB")
+    if 'numa_nodes' in system_info:
+        print(f"{lang.get('numa_nodes')}: {system_info['numa_nodes']}")
     
     # 打印GPU信息
     if 'gpus' in system_info and system_info['gpus']:
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+测试数据生成器测试
+运行方式: python -m pytest tests
+"""
+
+import mmap
+import unittest
+import zlib
+
+import numpy as np
+
+from data_generator import DataGenerator, SEGMENT_SIZE, STAMP_SIZE
+
+
+class DataGeneratorTest(unittest.TestCase):
+    def test_invalid_compressibility(self):
+        with self.assertRaises(ValueError):
+            DataGenerator(4096, compressibility=1.5)
+
+    def test_block_size(self):
+        generator = DataGenerator(3 * SEGMENT_SIZE + 100)
+        self.assertEqual(len(generator.next_block()), 3 * SEGMENT_SIZE + 100)
+
+    def test_compressibility(self):
+        block_size = 256 * 1024
+        for compressibility in (0.0, 0.5, 0.75):
+            generator = DataGenerator(block_size, compressibility=compressibility, seed=1)
+            compressed = len(zlib.compress(bytes(generator.next_block())))
+            ratio = 1 - compressed / block_size
+            self.assertAlmostEqual(ratio, compressibility, delta=0.05)
+
+    def test_fully_compressible_non_unique_is_zero(self):
+        generator = DataGenerator(8192, compressibility=1.0, unique=False)
+        self.assertEqual(bytes(generator.next_block()), bytes(8192))
+
+    def test_unique_blocks_are_stamped(self):
+        generator = DataGenerator(2 * SEGMENT_SIZE, compressibility=1.0, seed=0)
+        first = bytes(generator.next_block())
+        second = bytes(generator.next_block())
+        self.assertNotEqual(first, second)
+        for block_number, block in enumerate((first, second)):
+            for offset in range(0, len(block), SEGMENT_SIZE):
+                stamp = int.from_bytes(block[offset:offset + STAMP_SIZE], 'little')
+                self.assertEqual(stamp, block_number)
+            # 序号之后的部分保持为零
+            self.assertEqual(block[STAMP_SIZE:SEGMENT_SIZE], bytes(SEGMENT_SIZE - STAMP_SIZE))
+
+    def test_non_unique_blocks_repeat(self):
+        generator = DataGenerator(SEGMENT_SIZE, unique=False, seed=0)
+        self.assertEqual(bytes(generator.next_block()), bytes(generator.next_block()))
+
+    def test_seed_is_reproducible(self):
+        first = DataGenerator(SEGMENT_SIZE, compressibility=0.5, seed=7)
+        second = DataGenerator(SEGMENT_SIZE, compressibility=0.5, seed=7)
+        self.assertEqual(bytes(first.next_block()), bytes(second.next_block()))
+
+    def test_refill_changes_data(self):
+        generator = DataGenerator(SEGMENT_SIZE, unique=False, seed=3)
+        before = bytes(generator.next_block())
+        generator.refill()
+        self.assertNotEqual(bytes(generator.next_block()), before)
+
+    def test_external_buffer(self):
+        buffer = mmap.mmap(-1, SEGMENT_SIZE)
+        generator = DataGenerator(SEGMENT_SIZE, seed=0, buffer=buffer)
+        generator.next_block()
+        self.assertTrue(np.frombuffer(buffer, dtype=np.uint8).any())
+        generator.close()
+        buffer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
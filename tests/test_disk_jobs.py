@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+磁盘作业定义解析与校验测试
+运行方式: python -m pytest tests
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from disk_test import (JOB_DEFAULTS, DEFAULT_JOBS, DIRECT_IO_ALIGNMENT, _parse_size, _zipf_samples,
+                       normalize_job, load_job_file)
+
+
+class ParseSizeTest(unittest.TestCase):
+    def test_units(self):
+        self.assertEqual(_parse_size(4096), 4096)
+        self.assertEqual(_parse_size('4096'), 4096)
+        self.assertEqual(_parse_size('4k'), 4096)
+        self.assertEqual(_parse_size('4KB'), 4096)
+        self.assertEqual(_parse_size('1.5m'), 1536 * 1024)
+        self.assertEqual(_parse_size(' 2g '), 2 * 1024 ** 3)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            _parse_size('lots')
+
+
+class NormalizeJobTest(unittest.TestCase):
+    def test_defaults(self):
+        job = normalize_job({})
+        self.assertEqual(job, JOB_DEFAULTS)
+
+    def test_global_defaults_and_sizes(self):
+        job = normalize_job({'block_size': '8k'}, {'file_size': '1m', 'runtime': 3})
+        self.assertEqual(job['block_size'], 8192)
+        self.assertEqual(job['file_size'], 1024 * 1024)
+        self.assertEqual(job['runtime'], 3.0)
+
+    def test_default_jobs_are_valid(self):
+        for job in DEFAULT_JOBS:
+            normalize_job(job)
+
+    def test_rejects_invalid_jobs(self):
+        invalid = [
+            {'unknown_key': 1},
+            {'pattern': 'strided'},
+            {'sync': 'always'},
+            {'executor': 'fiber'},
+            {'read_percent': 120},
+            {'block_size': 0},
+            {'block_size': '2m', 'file_size': '1m'},
+            {'queue_depth': 0},
+            {'sync_interval': 0},
+        ]
+        for job in invalid:
+            with self.subTest(job=job), self.assertRaises(ValueError):
+                normalize_job(job)
+
+    def test_direct_alignment(self):
+        normalize_job({'direct': True, 'block_size': DIRECT_IO_ALIGNMENT * 2})
+        with self.assertRaises(ValueError):
+            normalize_job({'direct': True, 'block_size': DIRECT_IO_ALIGNMENT + 512})
+        with self.assertRaises(ValueError):
+            normalize_job({'direct': True, 'block_size': '8k', 'file_size': '12k'})
+        # 不使用 O_DIRECT 时不要求对齐
+        normalize_job({'direct': False, 'block_size': 1000})
+
+
+class LoadJobFileTest(unittest.TestCase):
+    def write_job_file(self, content):
+        handle, path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(handle, 'w', encoding='utf-8') as f:
+            json.dump(content, f)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_global_and_jobs(self):
+        path = self.write_job_file({
+            'global': {'file_size': '64m', 'runtime': 1},
+            'jobs': [{'name': 'a'}, {'name': 'b', 'runtime': 2}]
+        })
+        jobs = load_job_file(path)
+        self.assertEqual([job['name'] for job in jobs], ['a', 'b'])
+        self.assertEqual([job['runtime'] for job in jobs], [1.0, 2.0])
+        self.assertTrue(all(job['file_size'] == 64 * 1024 ** 2 for job in jobs))
+
+    def test_plain_list(self):
+        path = self.write_job_file([{'name': 'only', 'pattern': 'sequential'}])
+        self.assertEqual(load_job_file(path)[0]['pattern'], 'sequential')
+
+    def test_invalid_global(self):
+        path = self.write_job_file({'global': {'pattern': 'strided'}, 'jobs': [{}]})
+        with self.assertRaises(ValueError):
+            load_job_file(path)
+
+
+class ZipfSamplesTest(unittest.TestCase):
+    def test_range_and_skew(self):
+        samples = _zipf_samples(1000, 1.2, 50000, seed=1)
+        self.assertEqual(len(samples), 50000)
+        self.assertGreaterEqual(samples.min(), 0)
+        self.assertLess(samples.max(), 1000)
+        counts = np.sort(np.bincount(samples, minlength=1000))[::-1]
+        # 最热的块约占 1/H(1000, 1.2)，即约23%
+        self.assertAlmostEqual(counts[0] / len(samples), 0.23, delta=0.02)
+        self.assertGreater(counts[0], counts[9] * 10)
+
+    def test_reproducible(self):
+        np.testing.assert_array_equal(_zipf_samples(100, 1.1, 1000, 5), _zipf_samples(100, 1.1, 1000, 5))
+
+
+if __name__ == '__main__':
+    unittest.main()
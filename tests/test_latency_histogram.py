@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+延迟直方图测试
+运行方式: python -m pytest tests
+"""
+
+import unittest
+
+from latency_histogram import (LatencyHistogram, format_summary, _bucket_index, _bucket_upper_bound,
+                               SUB_BUCKET_COUNT, BUCKET_COUNT)
+
+
+class BucketTest(unittest.TestCase):
+    def test_small_values_have_exact_buckets(self):
+        for value in range(SUB_BUCKET_COUNT):
+            self.assertEqual(_bucket_index(value), value)
+            self.assertEqual(_bucket_upper_bound(value), value)
+
+    def test_bucket_contains_value(self):
+        for value in [64, 65, 100, 127, 128, 1000, 4095, 4096, 123456, 10 ** 9, 10 ** 12]:
+            index = _bucket_index(value)
+            self.assertLessEqual(value, _bucket_upper_bound(index))
+            if index > 0:
+                self.assertGreater(value, _bucket_upper_bound(index - 1))
+
+    def test_relative_error_is_bounded(self):
+        for value in [100, 1000, 54321, 10 ** 6, 987654321]:
+            upper = _bucket_upper_bound(_bucket_index(value))
+            self.assertLessEqual((upper - value) / value, 1 / 32)
+
+    def test_huge_values_use_last_bucket(self):
+        self.assertEqual(_bucket_index(1 << 62), BUCKET_COUNT - 1)
+
+
+class LatencyHistogramTest(unittest.TestCase):
+    def test_empty(self):
+        histogram = LatencyHistogram()
+        self.assertIsNone(histogram.percentile(50))
+        self.assertEqual(histogram.summary(), {'count': 0})
+        self.assertEqual(format_summary(histogram.summary()), "无记录")
+
+    def test_percentiles_of_exact_values(self):
+        histogram = LatencyHistogram()
+        for value in range(1, 61):
+            histogram.record(value)
+        self.assertEqual(histogram.percentile(50), 30)
+        self.assertEqual(histogram.percentile(90), 54)
+        self.assertEqual(histogram.percentile(100), 60)
+        self.assertEqual(histogram.percentile(0), 1)
+
+    def test_percentile_never_exceeds_max(self):
+        histogram = LatencyHistogram()
+        histogram.record(1000)
+        self.assertEqual(histogram.percentile(99.9), 1000)
+
+    def test_negative_values_are_clamped(self):
+        histogram = LatencyHistogram()
+        histogram.record(-5)
+        self.assertEqual(histogram.min, 0)
+
+    def test_summary_in_microseconds(self):
+        histogram = LatencyHistogram()
+        for value in (1000, 2000, 3000):
+            histogram.record(value)
+        summary = histogram.summary()
+        self.assertEqual(summary['count'], 3)
+        self.assertEqual(summary['min_us'], 1.0)
+        self.assertEqual(summary['mean_us'], 2.0)
+        self.assertEqual(summary['max_us'], 3.0)
+        self.assertAlmostEqual(summary['p50_us'], 2.0, delta=2.0 / 32)
+
+    def test_merge(self):
+        first = LatencyHistogram()
+        second = LatencyHistogram()
+        for value in range(10):
+            first.record(value)
+        for value in range(100, 110):
+            second.record(value)
+        merged = LatencyHistogram().merge(first).merge(second)
+        self.assertEqual(merged.count, 20)
+        self.assertEqual(merged.total, first.total + second.total)
+        self.assertEqual(merged.min, 0)
+        self.assertEqual(merged.max, 109)
+        self.assertEqual(merged.percentile(50), 9)
+
+    def test_merge_empty_keeps_bounds(self):
+        histogram = LatencyHistogram()
+        histogram.record(42)
+        histogram.merge(LatencyHistogram())
+        self.assertEqual((histogram.min, histogram.max, histogram.count), (42, 42, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
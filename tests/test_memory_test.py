@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+内存测试辅助函数测试（缓存层级推断、进程数序列）
+运行方式: python -m pytest tests
+"""
+
+import unittest
+
+from memory_test import _detect_cache_levels, _process_counts
+
+KB = 1024
+MB = 1024 * 1024
+
+
+def synthetic_curve(plateaus, start=4 * KB, points=14):
+    """按平台生成延迟曲线：plateaus 为 (容量上限, 延迟) 列表，超过所有上限的工作集为DRAM"""
+    sizes = [start * 2 ** i for i in range(points)]
+    latencies = []
+    for size in sizes:
+        latency = next((latency for limit, latency in plateaus if size <= limit), 80.0)
+        latencies.append(latency)
+    return sizes, latencies
+
+
+class DetectCacheLevelsTest(unittest.TestCase):
+    def test_positional_names_without_known_sizes(self):
+        sizes, latencies = synthetic_curve([(32 * KB, 1.0), (1 * MB, 4.0), (8 * MB, 12.0)])
+        levels = _detect_cache_levels(sizes, latencies)
+        self.assertEqual([level['level'] for level in levels], ['L1', 'L2', 'L3', 'DRAM'])
+        self.assertEqual([level['size_bytes'] for level in levels], [32 * KB, 1 * MB, 8 * MB, None])
+        self.assertEqual([level['latency_ns'] for level in levels], [1.0, 4.0, 12.0, 80.0])
+
+    def test_known_sizes_name_boundaries(self):
+        sizes, latencies = synthetic_curve([(32 * KB, 1.0), (1 * MB, 4.0), (8 * MB, 12.0)])
+        known = {'L1': 48 * KB, 'L2': 2 * MB, 'L3': 12 * MB}
+        levels = _detect_cache_levels(sizes, latencies, known_sizes=known)
+        self.assertEqual([level['level'] for level in levels], ['L1', 'L2', 'L3', 'DRAM'])
+
+    def test_each_known_level_is_used_once(self):
+        # 两个跳变点都最接近L2时，第二个不能再命名为L2
+        sizes, latencies = synthetic_curve([(1 * MB, 2.0), (16 * MB, 10.0)])
+        known = {'L1': 48 * KB, 'L2': 2 * MB, 'L3': 110 * MB}
+        levels = _detect_cache_levels(sizes, latencies, known_sizes=known)
+        names = [level['level'] for level in levels]
+        self.assertEqual(names, ['L2', 'L3', 'DRAM'])
+
+    def test_names_increase_with_capacity(self):
+        # 第一个跳变点匹配L3后，后面的跳变点不能回到更小的层级
+        sizes, latencies = synthetic_curve([(8 * MB, 3.0), (64 * MB, 20.0)], points=16)
+        known = {'L1': 64 * KB, 'L2': 48 * MB, 'L3': 8 * MB}
+        levels = _detect_cache_levels(sizes, latencies, known_sizes=known)
+        self.assertEqual([level['level'] for level in levels], ['L3', 'L4', 'DRAM'])
+
+    def test_small_jumps_are_ignored(self):
+        sizes, latencies = synthetic_curve([(64 * KB, 1.0)])
+        latencies = [latency * (1 + 0.01 * i) for i, latency in enumerate(latencies)]
+        levels = _detect_cache_levels(sizes, latencies)
+        self.assertEqual([level['level'] for level in levels], ['L1', 'DRAM'])
+        self.assertEqual(levels[0]['size_bytes'], 64 * KB)
+
+    def test_max_levels_keeps_largest_jumps(self):
+        sizes, latencies = synthetic_curve([(8 * KB, 1.0), (32 * KB, 1.3), (256 * KB, 5.0), (4 * MB, 20.0)])
+        levels = _detect_cache_levels(sizes, latencies, max_levels=2)
+        self.assertEqual([level['size_bytes'] for level in levels], [256 * KB, 4 * MB, None])
+
+    def test_flat_curve_is_dram(self):
+        sizes, latencies = synthetic_curve([])
+        self.assertEqual(_detect_cache_levels(sizes, latencies),
+                         [{'level': 'DRAM', 'size_bytes': None, 'latency_ns': 80.0}])
+
+
+class ProcessCountsTest(unittest.TestCase):
+    def test_sequence(self):
+        self.assertEqual(_process_counts(1), [1])
+        self.assertEqual(_process_counts(2), [1, 2])
+        self.assertEqual(_process_counts(8), [1, 2, 3, 4, 6, 8])
+        self.assertEqual(_process_counts(16), [1, 2, 3, 4, 6, 8, 12, 16])
+
+    def test_includes_maximum(self):
+        self.assertEqual(_process_counts(5), [1, 2, 3, 4, 5])
+        self.assertEqual(_process_counts(10), [1, 2, 3, 4, 6, 8, 10])
+
+
+if __name__ == '__main__':
+    unittest.main()
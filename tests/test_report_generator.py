@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+得分计算测试（磁盘测试目标的计分规则）
+运行方式: python -m pytest tests
+"""
+
+import unittest
+
+from report_generator import calculate_scores
+
+
+def disk_result(fstype='ext4', non_disk=False, allow_non_disk=False, **speeds):
+    """构造 disk_io_test 形式的结果字典"""
+    result = {
+        'write_speed_mb_s': 400.0,
+        'read_speed_mb_s': 600.0,
+        'write_sync_speed_mb_s': 200.0,
+        'read_uncached_speed_mb_s': 150.0,
+        'direct_read_speed_mb_s': 300.0,
+        'target': {'device': '/dev/sda1', 'mountpoint': '/data', 'fstype': fstype, 'non_disk': non_disk},
+        'allow_non_disk': allow_non_disk,
+    }
+    result.update(speeds)
+    return result
+
+
+class DiskScoreTest(unittest.TestCase):
+    def test_disk_target_is_scored(self):
+        scores = calculate_scores({'disk_io': disk_result()})
+        self.assertEqual(scores['disk_write'], 200.0 / 100)
+        self.assertEqual(scores['disk_read'], 150.0 / 75)
+        self.assertNotIn('disk_excluded', scores)
+
+    def test_non_disk_target_is_excluded(self):
+        scores = calculate_scores({'disk_io': disk_result('tmpfs', non_disk=True)})
+        self.assertEqual(scores['disk_write'], 0)
+        self.assertEqual(scores['disk_read'], 0)
+        self.assertEqual(scores['disk_excluded'], "tmpfs (/data)")
+        self.assertEqual(scores['total'], 0)
+
+    def test_allow_non_disk_scores_target(self):
+        scores = calculate_scores({'disk_io': disk_result('overlay', non_disk=True, allow_non_disk=True)})
+        self.assertEqual(scores['disk_write'], 2.0)
+        self.assertNotIn('disk_excluded', scores)
+
+    def test_read_falls_back_to_direct_then_page_cache(self):
+        scores = calculate_scores({'disk_io': disk_result(read_uncached_speed_mb_s=None)})
+        self.assertEqual(scores['disk_read'], 300.0 / 75)
+        scores = calculate_scores({'disk_io': disk_result(read_uncached_speed_mb_s=None,
+                                                          direct_read_speed_mb_s=None)})
+        self.assertEqual(scores['disk_read'], 600.0 / 75)
+
+    def test_old_report_without_target(self):
+        scores = calculate_scores({'disk_io': {'write_speed_mb_s': 100.0, 'read_speed_mb_s': 75.0}})
+        self.assertEqual((scores['disk_write'], scores['disk_read']), (1.0, 1.0))
+        self.assertNotIn('disk_excluded', scores)
+
+    def test_missing_disk_result(self):
+        for results in ({}, {'disk_io': None}):
+            scores = calculate_scores(results)
+            self.assertEqual((scores['disk_write'], scores['disk_read']), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+系统信息解析测试
+运行方式: python -m pytest tests
+"""
+
+import unittest
+
+from system_info import _parse_cpulist, get_numa_topology
+
+
+class ParseCpulistTest(unittest.TestCase):
+    def test_single_cpu(self):
+        self.assertEqual(_parse_cpulist('0\n'), [0])
+
+    def test_ranges_and_singles(self):
+        self.assertEqual(_parse_cpulist('0-3,8-11'), [0, 1, 2, 3, 8, 9, 10, 11])
+        self.assertEqual(_parse_cpulist('0,2,4-5'), [0, 2, 4, 5])
+
+    def test_empty(self):
+        self.assertEqual(_parse_cpulist(''), [])
+        self.assertEqual(_parse_cpulist('\n'), [])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            _parse_cpulist('0-a')
+
+
+class NumaTopologyTest(unittest.TestCase):
+    def test_topology_covers_cpus(self):
+        topology = get_numa_topology()
+        self.assertTrue(topology)
+        self.assertEqual(list(topology), sorted(topology))
+        cpus = [cpu for node_cpus in topology.values() for cpu in node_cpus]
+        self.assertEqual(len(cpus), len(set(cpus)))
+
+
+if __name__ == '__main__':
+    unittest.main()